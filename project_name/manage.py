@@ -6,11 +6,14 @@ if __name__ == "__main__":
 
     settings = {
         'test': "{{project_name}}.settings.test",
-        'dev': "{{project_name}}.settings.dev"
+        'dev': "{{project_name}}.settings.dev",
+        'benchmark': "{{project_name}}.settings.benchmark",
     }
 
     if sys.argv[1] == 'test':
         os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings['test'])
+    elif sys.argv[1] == 'benchmark':
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings['benchmark'])
     else:
         os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings['dev'])
 
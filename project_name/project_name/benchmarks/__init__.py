@@ -0,0 +1,19 @@
+"""
+Benchmark suite for the libs package.
+
+Times the hot helpers of libs/ (pagination, serializers, shortuuid encoding,
+list_to_dict, soft-delete querysets, audited saves and CSV export) against
+generated fixtures of several sizes, and compares the results with a
+previous run.
+
+manage.py runs it with its own settings (settings/benchmark.py), on SQLite
+in memory by default (set BENCH_DB_ENGINE, BENCH_DB_NAME, ... to use a local
+Postgres instead):
+
+    $ python manage.py benchmark --output bench-baseline.json
+    ... change code ...
+    $ python manage.py benchmark --baseline bench-baseline.json
+
+The command exits with an error when a case got slower than the baseline by
+more than --tolerance.
+"""
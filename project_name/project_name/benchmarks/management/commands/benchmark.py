@@ -0,0 +1,106 @@
+"""
+Run the libs benchmark suite, optionally comparing with a baseline.
+See {{project_name}}/benchmarks/__init__.py
+"""
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from ...suite import CASES, populate
+
+
+def measure(func, rounds):
+    """Run func `rounds` times (after one warmup call), timings in ms."""
+    func()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'rounds': rounds,
+        'min_ms': round(min(timings), 4),
+        'median_ms': round(statistics.median(timings), 4),
+        'max_ms': round(max(timings), 4),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the libs helpers at several fixture sizes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000',
+                            help='Comma separated fixture sizes.')
+        parser.add_argument('--rounds', type=int, default=5,
+                            help='Timed runs per case and size.')
+        parser.add_argument('--only', default='',
+                            help='Run only the cases whose name starts with this.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare with the results in this JSON file.')
+        parser.add_argument('--tolerance', type=float, default=0.15,
+                            help='Allowed slowdown against the baseline (0.15 = 15%%).')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size]
+        cases = [name for name in CASES if name.startswith(options['only'])]
+        if not cases:
+            raise CommandError('No benchmark case matches "{}".'.format(options['only']))
+
+        call_command('migrate', run_syncdb=True, interactive=False, verbosity=0)
+
+        results = {}
+        for size in sizes:
+            populate(size)
+            for name in cases:
+                key = '{}[{}]'.format(name, size)
+                results[key] = measure(CASES[name](size), options['rounds'])
+                self.stdout.write('{:<40} {:>12.3f} ms'.format(key, results[key]['median_ms']))
+
+        document = {
+            'meta': {
+                'date': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'rounds': options['rounds'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(document, output, indent=2, sort_keys=True)
+
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def compare(self, results, baseline_path, tolerance):
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+        regressions = []
+        self.stdout.write('\n{:<40} {:>12} {:>12} {:>8}'.format(
+            'case', 'baseline ms', 'current ms', 'ratio'))
+        for key, result in sorted(results.items()):
+            if key not in baseline:
+                continue
+            before = baseline[key]['median_ms']
+            ratio = result['median_ms'] / before if before else 1.0
+            line = '{:<40} {:>12.3f} {:>12.3f} {:>8.2f}'.format(
+                key, before, result['median_ms'], ratio)
+            if ratio > 1 + tolerance:
+                regressions.append(key)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError('{} case(s) slower than the baseline: {}'.format(
+                len(regressions), ', '.join(regressions)))
+        self.stdout.write(self.style.SUCCESS('No regression against {}'.format(baseline_path)))
@@ -0,0 +1,20 @@
+"""Models used only to generate benchmark fixtures."""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from ..libs.models import AuditedModel, PersistentModel, UUIDPrimaryKey
+
+
+class BenchItem(UUIDPrimaryKey, AuditedModel, PersistentModel):
+    """Audited, soft-deletable row, like most models of the apps."""
+
+    name = models.CharField(verbose_name=_('name'), max_length=128)
+    amount = models.DecimalField(verbose_name=_('amount'), max_digits=10, decimal_places=2)
+
+    class Meta(AuditedModel.Meta):
+        verbose_name = _('benchmark item')
+        verbose_name_plural = _('benchmark items')
+        indexes = [
+            models.Index(fields=['-created_at', '-updated_at'], name='benchitem_created_idx'),
+            models.Index(fields=['deleted'], name='benchitem_deleted_idx'),
+        ]
@@ -0,0 +1,248 @@
+"""
+Benchmark cases.
+
+A case is a function registered with @case, receiving the fixture size and
+returning the callable to time. Anything done before returning is setup and
+is not timed.
+"""
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+from threading import current_thread
+
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ..internal_services.batch import execute_many
+from ..internal_services.use_case_interface import UseCaseInterface
+from ..libs import global_request
+from ..libs.admin import ExportCsvMixin
+from ..libs.pagination import CustomPagination
+from ..libs.renderers import FastJSONRenderer
+from ..libs.serializers import AuditedModelSerializer
+from ..libs.shortuuid import encode
+from ..libs.utils import list_to_dict
+from .models import BenchItem
+
+CASES = OrderedDict()
+
+BENCH_USERNAME = 'benchmark'
+
+
+def case(name):
+    """Register a benchmark case under name."""
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+
+class BenchItemSerializer(AuditedModelSerializer):
+    class Meta:
+        model = BenchItem
+        fields = '__all__'
+
+
+class BenchItemCsvExport(ExportCsvMixin):
+    model = BenchItem
+
+
+def populate(size):
+    """Replace the fixtures with `size` BenchItem rows, 10% soft deleted."""
+    user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+    # Plain queryset: PersistentModelQuerySet.delete only soft deletes.
+    models.QuerySet(BenchItem).delete()
+    BenchItem.objects.bulk_create(
+        (
+            BenchItem(
+                name='item {}'.format(number),
+                amount=Decimal(number % 100000) / 100,
+                created_by=user,
+                updated_by=user,
+                deleted=number % 10 == 0,
+            )
+            for number in range(size)
+        ),
+        # No batch_size: the backend's own (SQLite limits the query size).
+    )
+
+
+def _drf_request(query_string=''):
+    return Request(APIRequestFactory().get('/bench/?' + query_string))
+
+
+@case('pagination.page')
+def pagination_page(size):
+    request = _drf_request('limit=30&offset={}'.format(size // 2))
+    queryset = BenchItem.objects.all()
+
+    def run():
+        paginator = CustomPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_response([item.name for item in page])
+    return run
+
+
+@case('pagination.unlimited')
+def pagination_unlimited(size):
+    request = _drf_request('limit=0')
+    queryset = BenchItem.objects.all()
+
+    def run():
+        paginator = CustomPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_response([item.name for item in page])
+    return run
+
+
+@case('serializers.list')
+def serializers_list(size):
+    items = list(BenchItem.objects.all())
+
+    def run():
+        return BenchItemSerializer(items, many=True).data
+    return run
+
+
+@case('shortuuid.encode')
+def shortuuid_encode(size):
+    uuids = [uuid.uuid4() for _ in range(size)]
+
+    def run():
+        return [encode(value) for value in uuids]
+    return run
+
+
+@case('utils.list_to_dict')
+def utils_list_to_dict(size):
+    rows = [{'id': number + 1, 'name': 'item {}'.format(number)} for number in range(size)]
+
+    def run():
+        return list_to_dict(rows)
+    return run
+
+
+@case('persistent.not_deleted')
+def persistent_not_deleted(size):
+    def run():
+        return list(BenchItem.objects.all())
+    return run
+
+
+@case('persistent.count_deleted')
+def persistent_count_deleted(size):
+    def run():
+        return BenchItem.objects.deleted().count()
+    return run
+
+
+@case('audited.save')
+def audited_save(size):
+    # AuditedModel.save reads the user of the current request.
+    request = APIRequestFactory().post('/bench/')
+    request.user = User.objects.get(username=BENCH_USERNAME)
+    count = min(size, 1000)
+
+    def run():
+        thread_id = current_thread().ident
+        global_request._REQUESTS[thread_id] = request  # pylint: disable=protected-access
+        try:
+            with transaction.atomic():
+                for number in range(count):
+                    BenchItem(name='saved {}'.format(number), amount=Decimal(number)).save()
+                transaction.set_rollback(True)
+        finally:
+            del global_request._REQUESTS[thread_id]  # pylint: disable=protected-access
+    return run
+
+
+@case('admin.export_csv')
+def admin_export_csv(size):
+    exporter = BenchItemCsvExport()
+    queryset = BenchItem.objects.all()
+
+    def run():
+        return exporter.export_as_csv(None, queryset)
+    return run
+
+
+def _paginated_document(size):
+    request = _drf_request('limit=0')
+    paginator = CustomPagination()
+    page = paginator.paginate_queryset(BenchItem.objects.all(), request)
+    return paginator.get_paginated_response(BenchItemSerializer(page, many=True).data).data
+
+
+@case('renderers.json_stdlib')
+def renderers_json_stdlib(size):
+    document = _paginated_document(size)
+    renderer = JSONRenderer()
+
+    def run():
+        return renderer.render(document)
+    return run
+
+
+@case('renderers.json_fast')
+def renderers_json_fast(size):
+    document = _paginated_document(size)
+    renderer = FastJSONRenderer()
+    # The point of the fast renderer is to be a drop-in replacement.
+    assert renderer.render(document) == JSONRenderer().render(document)
+
+    def run():
+        return renderer.render(document)
+    return run
+
+
+class RenameBenchItem(UseCaseInterface):
+    """Use case loading its item alone, or with prefetch() in batches."""
+
+    def __init__(self, pk, name):
+        self.pk = pk
+        self.name = name
+        self.item = None
+
+    @classmethod
+    def prefetch(cls, use_cases):
+        items = BenchItem.objects.in_bulk([use_case.pk for use_case in use_cases])
+        for use_case in use_cases:
+            use_case.item = items.get(use_case.pk)
+
+    def is_valid(self):
+        if self.item is None:
+            self.item = BenchItem.objects.filter(pk=self.pk).first()
+        return self.item is not None
+
+    def execute(self):
+        BenchItem.objects.filter(pk=self.item.pk).update(name=self.name)
+
+
+def _rename_targets(size):
+    pks = BenchItem.objects.values_list('pk', flat=True)[:min(size, 1000)]
+    return [(pk, 'renamed {}'.format(number)) for number, pk in enumerate(pks)]
+
+
+@case('use_cases.one_by_one')
+def use_cases_one_by_one(size):
+    pks_names = _rename_targets(size)
+
+    def run():
+        for pk, name in pks_names:
+            use_case = RenameBenchItem(pk, name)
+            with transaction.atomic():
+                if use_case.is_valid():
+                    use_case.execute()
+    return run
+
+
+@case('use_cases.execute_many')
+def use_cases_execute_many(size):
+    pks_names = _rename_targets(size)
+
+    def run():
+        return execute_many(RenameBenchItem(pk, name) for pk, name in pks_names)
+    return run
@@ -0,0 +1,126 @@
+"""
+PostgreSQL backend with a connection pool per worker process.
+
+Same as django.db.backends.postgresql_psycopg2, but connections are taken
+from (and given back to) a psycopg2 ThreadedConnectionPool instead of being
+opened and closed. Use it with CONN_MAX_AGE = 0, so every request gives its
+connection back to the pool when it finishes:
+
+    DATABASES = {
+        'default': {
+            'ENGINE': '{{project_name}}.db_backends.postgresql_pool',
+            ...
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool_min_size': 1,
+                'pool_max_size': 10,
+                'pool_timeout': 10,
+            },
+        }
+    }
+
+pool_max_size limits the connections of each worker: with N workers the
+database sees up to N * pool_max_size connections. When every connection of
+the pool is in use, a new one waits up to pool_timeout seconds for one to be
+given back, then OperationalError is raised.
+
+There is one pool per alias and connection parameters: the test database
+(another NAME) does not reuse the connections of the alias.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+from psycopg2 import pool as psycopg2_pool
+
+DEFAULT_POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 10
+DEFAULT_POOL_TIMEOUT = 10
+
+POOL_OPTIONS = ('pool_min_size', 'pool_max_size', 'pool_timeout')
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolExhausted(psycopg2_pool.PoolError):
+    """No connection of the pool was given back in time."""
+
+
+class BoundedConnectionPool(psycopg2_pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool whose getconn() waits for a free connection."""
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super(BoundedConnectionPool, self).__init__(minconn, maxconn, *args, **kwargs)
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self, key=None, timeout=None):
+        """A connection, PoolExhausted after timeout seconds (None: no limit)."""
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolExhausted('connection pool exhausted')
+        try:
+            return super(BoundedConnectionPool, self).getconn(key)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, key=None, close=False):
+        try:
+            super(BoundedConnectionPool, self).putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+def _get_pool(alias, conn_params, min_size, max_size):
+    pool_key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if pool_key not in _pools:
+            _pools[pool_key] = BoundedConnectionPool(min_size, max_size, **conn_params)
+        return _pools[pool_key]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        conn_params = super(DatabaseWrapper, self).get_connection_params()
+        for option in POOL_OPTIONS:
+            conn_params.pop(option, None)
+        return conn_params
+
+    def _pool(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        return _get_pool(
+            self.alias,
+            conn_params,
+            options.get('pool_min_size', DEFAULT_POOL_MIN_SIZE),
+            options.get('pool_max_size', DEFAULT_POOL_MAX_SIZE),
+        )
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict['OPTIONS']
+        timeout = options.get('pool_timeout', DEFAULT_POOL_TIMEOUT)
+        pool = self._pool(conn_params)
+        try:
+            connection = pool.getconn(timeout=timeout)
+        except PoolExhausted:
+            raise base.Database.OperationalError(
+                'No connection of the "{}" pool was free after {} seconds: raise '
+                'pool_max_size or look for connections not given back.'.format(
+                    self.alias, timeout)
+            )
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # Broken connections are discarded, the others are reused.
+                # The pool rolls back whatever transaction is left open.
+                self._pool(self.get_connection_params()).putconn(
+                    self.connection, close=bool(self.connection.closed)
+                )
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio counterpart of mysql_connection.sms_db_access.
+
+It exposes the same do_query / do_execute surface, but each call borrows its
+own connection from an aiomysql pool, so independent queries can run
+concurrently instead of one after the other:
+
+    db = await async_sms_db_access.create(host, database, username, password)
+    clients, invoices = await asyncio.gather(
+        db.do_query("SELECT * FROM clients WHERE zone = %s", (zone, )),
+        db.do_query("SELECT * FROM invoices WHERE month = %s", (month, )),
+    )
+    await db.close()
+
+The pool is injected in the constructor, so any object implementing
+``acquire()`` (an async context manager returning a connection with an async
+``cursor()``), ``close()`` and ``wait_closed()`` can be used instead of a real
+MySQL server, e.g. sqlite_pool.SQLitePool in tests:
+
+    db = async_sms_db_access(SQLitePool(path))
+
+The cursor classes come with the pool (create() uses aiomysql's). Without a
+dict cursor class, as_dict rows are built from the cursor description.
+aiomysql is only imported by create().
+"""
+from functools import wraps
+import logging
+from datetime import datetime
+
+from .instrumentation import track
+
+log = logging.getLogger(__name__)
+
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 10
+
+
+def _safely_do(func):
+    @wraps(func)
+    async def do_or_log(self, *args, **kwargs):
+        try:
+            return await func(self, *args, **kwargs)
+        except Exception as exception:
+            # The driver is not known here: DatabaseError args are logged too.
+            log.error(datetime.now())
+            log.error(exception.args)
+            log.error(exception)
+            raise
+    return do_or_log
+
+
+class async_sms_db_access(object):
+
+    def __init__(self, pool, cursor_class=None, dict_cursor_class=None):
+        """
+            cursor_class / dict_cursor_class are passed to connection.cursor(),
+            None: the connection's default cursor.
+        """
+        self._pool = pool
+        self._cursor_class = cursor_class
+        self._dict_cursor_class = dict_cursor_class
+
+    @classmethod
+    async def create(cls, host, database, username, password,
+                     minsize=POOL_MIN_SIZE, maxsize=POOL_MAX_SIZE, **kwargs):
+        """
+            Build an instance with its own aiomysql pool. Extra kwargs are
+            handed to aiomysql.create_pool (port, charset, loop, ...)
+        """
+        import aiomysql
+        pool = await aiomysql.create_pool(
+            host=host, db=database, user=username, password=password,
+            minsize=minsize, maxsize=maxsize, autocommit=True, **kwargs
+        )
+        return cls(pool, cursor_class=aiomysql.Cursor, dict_cursor_class=aiomysql.DictCursor)
+
+    def _cursor(self, connection, cursor_class=None):
+        if cursor_class is None:
+            return connection.cursor()
+        return connection.cursor(cursor_class)
+
+    @_safely_do
+    async def do_query(self, query, params=(), as_dict=False):
+        cursor_class = self._dict_cursor_class if as_dict else self._cursor_class
+        async with self._pool.acquire() as connection:
+            async with self._cursor(connection, cursor_class) as cr:
+                with track(query) as tracked:
+                    await cr.execute(query, params)
+                    rows = await cr.fetchall() or []
+                    tracked.rows = len(rows)
+                if as_dict and cursor_class is None:
+                    names = [column[0] for column in cr.description]
+                    rows = [dict(zip(names, row)) for row in rows]
+                return rows
+
+    @_safely_do
+    async def do_execute(self, query, params=()):
+        async with self._pool.acquire() as connection:
+            async with self._cursor(connection, self._cursor_class) as cr:
+                with track(query) as tracked:
+                    await cr.execute(query, params)
+                    tracked.rows = cr.rowcount
+                return cr.rowcount
+
+    async def close(self):
+        self._pool.close()
+        await self._pool.wait_closed()
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Timing and slow-query log for the legacy MySQL access layer.
+
+Every statement run through sms_db_access / async_sms_db_access is wrapped in
+``track(query)``, which records its duration and the rows fetched (or
+affected) under a normalised fingerprint of the statement, so
+"SELECT * FROM t WHERE id = 3" and "SELECT * FROM t WHERE id = 7" are
+aggregated together.
+
+Statements slower than LEGACY_DB_SLOW_QUERY_MS (setting, default 500) are
+logged with level WARNING in the "legacy_db.slow" logger.
+
+Counters are kept per process. ``get_query_stats()`` returns them with p50/p95
+durations, ready to be dumped by a metrics endpoint or a management command.
+"""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict, deque
+
+log = logging.getLogger(__name__)
+slow_log = logging.getLogger('legacy_db.slow')
+
+DEFAULT_SLOW_QUERY_MS = 500
+# Durations kept per fingerprint to compute percentiles.
+SAMPLES_PER_FINGERPRINT = 1000
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%\(\w+\)s|%s')
+_IN_LIST_RE = re.compile(r'\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACES_RE = re.compile(r'\s+')
+
+
+def fingerprint(query):
+    """
+        Normalise a statement: literals and placeholders are replaced by '?',
+        IN lists collapsed and whitespace/case unified.
+    """
+    query = _STRING_RE.sub('?', query)
+    query = _PLACEHOLDER_RE.sub('?', query)
+    query = _NUMBER_RE.sub('?', query)
+    query = _SPACES_RE.sub(' ', query).strip().lower()
+    return _IN_LIST_RE.sub('in (?+)', query)
+
+
+def _slow_query_threshold_ms():
+    try:
+        from django.conf import settings
+        return getattr(settings, 'LEGACY_DB_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    except Exception:  # settings not configured (scripts, shell)
+        return DEFAULT_SLOW_QUERY_MS
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    index = int(round((len(sorted_values) - 1) * percent / 100.0))
+    return sorted_values[index]
+
+
+class _FingerprintStats(object):
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=SAMPLES_PER_FINGERPRINT)
+
+    def add(self, duration_ms, rows, failed):
+        self.count += 1
+        self.rows += rows or 0
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.samples.append(duration_ms)
+        if failed:
+            self.errors += 1
+
+    def as_dict(self):
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_ms, 3),
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': _percentile(samples, 50),
+            'p95_ms': _percentile(samples, 95),
+        }
+
+
+_STATS = defaultdict(_FingerprintStats)
+_STATS_LOCK = threading.Lock()
+
+
+def record(query, duration_ms, rows=None, failed=False):
+    """Add one execution of query to the counters and log it if slow."""
+    key = fingerprint(query)
+    with _STATS_LOCK:
+        _STATS[key].add(duration_ms, rows, failed)
+
+    log.debug('[legacy_db] %.2fms rows=%s %s', duration_ms, rows, key)
+    if duration_ms >= _slow_query_threshold_ms():
+        slow_log.warning('[legacy_db] slow query %.2fms rows=%s: %s', duration_ms, rows, key)
+
+
+class track(object):
+    """
+        Context manager timing one statement. Set ``rows`` on it before
+        leaving the block:
+
+        with track(query) as tracked:
+            cursor.execute(query, params)
+            tracked.rows = cursor.rowcount
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.rows = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        record(self.query, duration_ms, rows=self.rows, failed=exc_type is not None)
+        return False
+
+
+def get_query_stats():
+    """
+        Return counters per fingerprint, slowest (by total time) first:
+        [{'fingerprint': ..., 'count': ..., 'p50_ms': ..., 'p95_ms': ..., ...}]
+    """
+    with _STATS_LOCK:
+        stats = [dict(fingerprint=key, **value.as_dict()) for key, value in _STATS.items()]
+    return sorted(stats, key=lambda item: item['total_ms'], reverse=True)
+
+
+def reset_query_stats():
+    with _STATS_LOCK:
+        _STATS.clear()
@@ -3,9 +3,12 @@
 import MySQLdb
 from functools import wraps
 import logging
-log = logging.getLogger(__name__)
 from datetime import datetime
 
+from .instrumentation import track
+
+log = logging.getLogger(__name__)
+
 def _safely_do(func):
     @wraps(func)
     def do_or_log(self, *args, **kwargs):
@@ -44,15 +47,20 @@ class sms_db_access(object):
 
     @_safely_do
     def do_query(self, query, params=(), as_dict=False):
-        return self._do_query(query, params=params)
+        with track(query) as tracked:
+            rows = self._do_query(query, params=params)
+            tracked.rows = len(rows)
+        return rows
 
     @_safely_do
     def do_execute(self, query, params=()):
-        self._cr.execute(query, params)
+        with track(query) as tracked:
+            self._cr.execute(query, params)
+            tracked.rows = self._cr.rowcount
 
     @_safely_do
     def _do_query(self, query, params=()):
-        self.do_execute(query, params)
+        self._cr.execute(query, params)
         return self._cr.fetchall() or []
 
     def close(self):
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite stand-in for the aiomysql pool of async_mysql_connection.
+
+Same acquire() / close() / wait_closed() surface, so async_sms_db_access runs
+against a SQLite file in tests and local scripts, without a MySQL server:
+
+    db = async_sms_db_access(SQLitePool('/tmp/legacy.sqlite3'))
+
+Statements are written for MySQL: the %s placeholders are turned into
+SQLite's ?, nothing else is translated. The sqlite3 calls run in the default
+executor of the event loop, one connection per acquire() at a time, in
+autocommit mode like the aiomysql pool.
+"""
+import asyncio
+import sqlite3
+
+POOL_MAX_SIZE = 10
+
+
+def _to_qmark(query):
+    return query.replace('%s', '?')
+
+
+class SQLiteCursor(object):
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    async def _run(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    async def execute(self, query, params=()):
+        await self._run(self._cursor.execute, _to_qmark(query), params)
+        return self._cursor.rowcount
+
+    async def fetchall(self):
+        return await self._run(self._cursor.fetchall)
+
+    async def close(self):
+        self._cursor.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class SQLiteConnection(object):
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, cursor_class=SQLiteCursor):
+        return cursor_class(self._connection.cursor())
+
+    def close(self):
+        self._connection.close()
+
+
+class _Acquire(object):
+    """Async context manager of SQLitePool.acquire()."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._connection = None
+
+    async def __aenter__(self):
+        self._connection = await self._pool._get()
+        return self._connection
+
+    async def __aexit__(self, *exc_info):
+        self._pool._release(self._connection)
+
+
+class SQLitePool(object):
+    """At most maxsize connections to the SQLite database at path."""
+
+    def __init__(self, path, maxsize=POOL_MAX_SIZE, **connect_kwargs):
+        self._path = path
+        self._connect_kwargs = connect_kwargs
+        self._semaphore = asyncio.Semaphore(maxsize)
+        self._free = []
+        self._connections = []
+
+    def _connect(self):
+        connection = sqlite3.connect(self._path, isolation_level=None,
+                                     check_same_thread=False, **self._connect_kwargs)
+        return SQLiteConnection(connection)
+
+    async def _get(self):
+        await self._semaphore.acquire()
+        if self._free:
+            return self._free.pop()
+        connection = self._connect()
+        self._connections.append(connection)
+        return connection
+
+    def _release(self, connection):
+        self._free.append(connection)
+        self._semaphore.release()
+
+    def acquire(self):
+        return _Acquire(self)
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._free = []
+
+    async def wait_closed(self):
+        pass
@@ -0,0 +1,86 @@
+"""
+async_sms_db_access run against the SQLite stand-in of the aiomysql pool.
+
+    python -Wall manage.py test {{project_name}}.db_connections.test__async_mysql_connection
+"""
+import asyncio
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+
+from .async_mysql_connection import async_sms_db_access
+from .sqlite_pool import SQLitePool
+
+
+class AsyncSmsDbAccessTest(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    async def open_db(self):
+        db = async_sms_db_access(SQLitePool(os.path.join(self.directory, 'legacy.sqlite3')))
+        await db.do_execute('CREATE TABLE clients (id INTEGER PRIMARY KEY, name TEXT, zone TEXT)')
+        for name, zone in (('ana', 'north'), ('bob', 'south'), ('eve', 'north')):
+            await db.do_execute('INSERT INTO clients (name, zone) VALUES (%s, %s)', (name, zone))
+        return db
+
+    def test_do_query(self):
+        async def scenario():
+            db = await self.open_db()
+            try:
+                return (
+                    await db.do_query('SELECT name FROM clients WHERE zone = %s ORDER BY id',
+                                      ('north', )),
+                    await db.do_query('SELECT id, name FROM clients WHERE zone = %s',
+                                      ('south', ), as_dict=True),
+                )
+            finally:
+                await db.close()
+
+        rows, dict_rows = self.run_async(scenario())
+        self.assertEqual(rows, [('ana', ), ('eve', )])
+        self.assertEqual(dict_rows, [{'id': 2, 'name': 'bob'}])
+
+    def test_do_execute_returns_rowcount(self):
+        async def scenario():
+            db = await self.open_db()
+            try:
+                return await db.do_execute('UPDATE clients SET zone = %s WHERE zone = %s',
+                                           ('east', 'north'))
+            finally:
+                await db.close()
+
+        self.assertEqual(self.run_async(scenario()), 2)
+
+    def test_concurrent_queries(self):
+        async def scenario():
+            db = await self.open_db()
+            try:
+                return await asyncio.gather(*(
+                    db.do_query('SELECT COUNT(*) FROM clients WHERE zone = %s', (zone, ))
+                    for zone in ('north', 'south', 'west')
+                ))
+            finally:
+                await db.close()
+
+        self.assertEqual(self.run_async(scenario()), [[(2, )], [(1, )], [(0, )]])
+
+    def test_error_is_raised(self):
+        async def scenario():
+            db = await self.open_db()
+            try:
+                await db.do_query('SELECT * FROM missing')
+            finally:
+                await db.close()
+
+        with self.assertLogs('{}.async_mysql_connection'.format(__package__), 'ERROR'):
+            with self.assertRaises(Exception):
+                self.run_async(scenario())
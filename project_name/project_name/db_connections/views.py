@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Metrics endpoint for the legacy MySQL access layer."""
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .instrumentation import get_query_stats, reset_query_stats
+
+
+class LegacyQueryStatsView(APIView):
+    """
+    GET: per fingerprint counters (count, rows, p50/p95 ms) of this process.
+    DELETE: reset the counters.
+    """
+    permission_classes = (permissions.IsAdminUser, )
+
+    def get(self, request):
+        return Response(get_query_stats())
+
+    def delete(self, request):
+        reset_query_stats()
+        return Response(status=204)
@@ -0,0 +1,144 @@
+"""
+Batched execution of use cases.
+
+    results = execute_many(use_cases, batch_size=100)
+    failed = [result for result in results if not result.ok]
+
+Use cases are run by batches of batch_size:
+    - UseCaseInterface.prefetch() is called once per batch and use case
+      class, so a batch shares its queries instead of each use case doing
+      its own,
+    - each batch runs in one transaction (atomic=False: no transaction),
+    - invalid use cases (is_valid() False) are not executed, their result
+      has an InvalidUseCase error.
+
+An exception raised by execute() rolls the batch back and is raised by
+execute_many (batches already done stay committed). With
+isolate_errors=True each use case runs in a savepoint instead: a failing
+one (is_valid() included) is rolled back alone and its error is in its
+result.
+
+workers > 1 runs the batches in parallel, in threads or, with
+processes=True, in processes (use cases must then be picklable). Only
+for independent use cases: batches do not see each other's changes before
+they commit, and their order is not guaranteed.
+
+Every result has the duration of the use case (is_valid + execute).
+on_timing(use_case, seconds, error) is called for each of them, in the
+calling thread, e.g. to feed metrics.
+"""
+import logging
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.db import connections, transaction
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+
+class InvalidUseCase(Exception):
+    """Error of the result of a use case whose is_valid() is False."""
+
+
+class UseCaseResult(namedtuple('UseCaseResult', 'use_case value error duration')):
+    """Outcome of one use case: value returned by execute() or error."""
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _by_class(use_cases):
+    groups = OrderedDict()
+    for use_case in use_cases:
+        groups.setdefault(type(use_case), []).append(use_case)
+    return groups
+
+
+def _validate_and_execute(use_case):
+    if not use_case.is_valid():
+        raise InvalidUseCase(repr(use_case))
+    return use_case.execute()
+
+
+def _run_one(use_case, savepoint, isolate_errors, using):
+    started = time.perf_counter()
+    try:
+        if savepoint:
+            # is_valid() queries too: a failing one must not abort the
+            # batch's transaction (PostgreSQL refuses any further query).
+            with transaction.atomic(using=using):
+                value = _validate_and_execute(use_case)
+        else:
+            value = _validate_and_execute(use_case)
+    except InvalidUseCase as err:
+        return UseCaseResult(use_case, None, err, time.perf_counter() - started)
+    except Exception as err:  # pylint: disable=broad-except
+        if not isolate_errors:
+            raise
+        return UseCaseResult(use_case, None, err, time.perf_counter() - started)
+    return UseCaseResult(use_case, value, None, time.perf_counter() - started)
+
+
+def run_batch(use_cases, atomic=True, isolate_errors=False, using=None):
+    """Run one batch in the current thread, see module docstring."""
+    with ExitStack() as stack:
+        if atomic:
+            stack.enter_context(transaction.atomic(using=using))
+        for use_case_class, group in _by_class(use_cases).items():
+            use_case_class.prefetch(group)
+        return [
+            _run_one(use_case, atomic and isolate_errors, isolate_errors, using)
+            for use_case in use_cases
+        ]
+
+
+def _run_batch_in_worker(use_cases, atomic, isolate_errors, using):
+    try:
+        return run_batch(use_cases, atomic, isolate_errors, using)
+    finally:
+        # Connections opened by this worker thread are not reused.
+        connections.close_all()
+
+
+def execute_many(use_cases, batch_size=DEFAULT_BATCH_SIZE, atomic=True, isolate_errors=False,
+                 workers=None, processes=False, on_timing=None, using=None):
+    """
+    Validate and execute use_cases by batches, return their UseCaseResult
+    in the same order. See module docstring.
+    """
+    use_cases = list(use_cases)
+    batches = [use_cases[start:start + batch_size]
+               for start in range(0, len(use_cases), batch_size)]
+    started = time.perf_counter()
+
+    if not workers or workers < 2 or len(batches) < 2:
+        batch_results = (run_batch(batch, atomic, isolate_errors, using) for batch in batches)
+    else:
+        if processes:
+            # Forked processes must not share this process' connections.
+            connections.close_all()
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor_class(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_run_batch_in_worker, batch, atomic, isolate_errors, using)
+                for batch in batches
+            ]
+            batch_results = [future.result() for future in futures]
+
+    results = []
+    for batch_result in batch_results:
+        for result in batch_result:
+            if on_timing is not None:
+                on_timing(result.use_case, result.duration, result.error)
+            results.append(result)
+
+    log.debug('[use cases] %d executed in %d batches in %.3fs, %d failed',
+              len(results), len(batches), time.perf_counter() - started,
+              sum(1 for result in results if not result.ok))
+    return results
@@ -0,0 +1,129 @@
+"""
+Concurrent execution of use cases.
+
+Use cases have async variants of execute() and is_valid(): aexecute() and
+ais_valid(). By default they run the sync methods in a thread pool
+(USE_CASE_THREADS threads), so every use case can be awaited; a use case
+doing I/O natively (aiohttp, the aiomysql legacy layer of
+db_connections.async_mysql_connection, ...) overrides them.
+
+    results = await run_concurrently(use_cases, limit=10, timeout=5)
+
+    # From sync code (views, services, crons):
+    results = execute_concurrently(use_cases, limit=10, timeout=5)
+
+At most `limit` use cases run at the same time. A use case taking more than
+`timeout` seconds (ais_valid + aexecute) is cancelled and its result has an
+asyncio.TimeoutError; `total_timeout` cancels everything still running.
+Results are batch.UseCaseResult, in the order of use_cases. With
+return_exceptions=False the first error cancels the other use cases and is
+raised.
+
+Cancelling a use case bridged to a thread does not stop the thread: its
+result is just dropped. Use cases must be independent, they run in no
+particular order and each thread has its own database connection (and
+transaction).
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .batch import InvalidUseCase, UseCaseResult
+
+log = logging.getLogger(__name__)
+
+DEFAULT_THREADS = 10
+DEFAULT_LIMIT = 10
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Thread pool running the sync use cases awaited, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'USE_CASE_THREADS', DEFAULT_THREADS),
+                thread_name_prefix='use-cases',
+            )
+    return _executor
+
+
+def _call(func):
+    # Same as around a request: drop connections that are broken or too old.
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func):
+    """Await sync func, run in the use cases thread pool."""
+    return await asyncio.get_event_loop().run_in_executor(get_executor(), _call, func)
+
+
+async def _validate_and_execute(use_case):
+    if not await use_case.ais_valid():
+        raise InvalidUseCase(repr(use_case))
+    return await use_case.aexecute()
+
+
+async def _run_one(use_case, semaphore, timeout, return_exceptions):
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            # The timeout covers the validation too.
+            value = await asyncio.wait_for(_validate_and_execute(use_case), timeout)
+        except asyncio.CancelledError:
+            raise
+        except InvalidUseCase as err:
+            return UseCaseResult(use_case, None, err, time.perf_counter() - started)
+        except Exception as err:  # pylint: disable=broad-except
+            if not return_exceptions:
+                raise
+            return UseCaseResult(use_case, None, err, time.perf_counter() - started)
+        return UseCaseResult(use_case, value, None, time.perf_counter() - started)
+
+
+async def run_concurrently(use_cases, limit=DEFAULT_LIMIT, timeout=None, total_timeout=None,
+                           return_exceptions=True, on_timing=None):
+    """Run use_cases concurrently, see module docstring."""
+    semaphore = asyncio.Semaphore(limit)
+    tasks = [
+        asyncio.ensure_future(_run_one(use_case, semaphore, timeout, return_exceptions))
+        for use_case in use_cases
+    ]
+    started = time.perf_counter()
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*tasks), total_timeout)
+    except BaseException:
+        # Timeout, first error or cancellation of the caller: stop them all.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    if on_timing is not None:
+        for result in results:
+            on_timing(result.use_case, result.duration, result.error)
+    log.debug('[use cases] %d executed concurrently in %.3fs, %d failed',
+              len(results), time.perf_counter() - started,
+              sum(1 for result in results if not result.ok))
+    return results
+
+
+def execute_concurrently(use_cases, **options):
+    """run_concurrently for sync callers, in a new event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run_concurrently(use_cases, **options))
+    finally:
+        loop.close()
@@ -1,5 +1,7 @@
 import abc
 
+from . import fan_out
+
 
 class UseCaseInterface(metaclass=abc.ABCMeta):
 
@@ -11,3 +13,22 @@ class UseCaseInterface(metaclass=abc.ABCMeta):
     def is_valid(self):
         pass
 
+    async def aexecute(self):
+        """
+        Async execute(). Runs execute() in the use cases thread pool, override
+        it in use cases doing their I/O asynchronously (see fan_out).
+        """
+        return await fan_out.run_sync(self.execute)
+
+    async def ais_valid(self):
+        """Async is_valid(), same as aexecute()."""
+        return await fan_out.run_sync(self.is_valid)
+
+    @classmethod
+    def prefetch(cls, use_cases):
+        """
+        Called by batch.execute_many once per batch with the use cases of
+        this class, before any of them is validated or executed: load what
+        they need with a few queries for the whole batch (in_bulk,
+        prefetch_related_objects, ...) and attach it to them.
+        """
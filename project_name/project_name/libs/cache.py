@@ -0,0 +1,152 @@
+"""
+Stampede safe caching.
+
+get_or_compute(key, compute, ttl) returns the cached value of key, calling
+compute() to (re)build it. Compared to a plain cache.get/cache.set it
+protects the database when a popular value expires:
+
+- Probabilistic early expiration (XFetch): before the value expires, each
+  reader recomputes it with a probability growing as expiry gets closer and
+  proportional to how long compute() takes, so one worker usually refreshes
+  it before it expires for everybody.
+- Single flight: only the worker holding the lock (cache.add, shared by all
+  workers through the cache backend) runs compute().
+- Stale while revalidate: the entry outlives its ttl by stale_ttl seconds.
+  While the lock holder recomputes, the other workers get the stale value.
+- Negative caching: a None result is cached too, for negative_ttl seconds,
+  so lookups of missing data do not hit the database every time.
+
+From a viewset:
+
+    def list(self, request, *args, **kwargs):
+        totals = get_or_compute(
+            'invoice-totals:{}'.format(request.user.pk),
+            lambda: Invoice.objects.filter(...).aggregate(...),
+            ttl=60,
+        )
+
+From a get_setting_param style helper:
+
+    def get_setting_param_cached(key):
+        return get_or_compute('param:{}'.format(key),
+                              lambda: get_setting_param(key), ttl=300)
+
+See also libs.decorators.cached, the decorator form.
+"""
+import logging
+import math
+import random
+import time
+
+from django.core.cache import cache as default_cache
+
+log = logging.getLogger(__name__)
+
+DEFAULT_STALE_TTL = 60
+DEFAULT_NEGATIVE_TTL = 30
+DEFAULT_LOCK_TIMEOUT = 30
+DEFAULT_BETA = 1.0
+# Seconds between cache polls while waiting for another worker's result.
+WAIT_INTERVAL = 0.05
+
+
+class CacheEntry(object):
+    """What is stored in the backend: the value plus its metadata."""
+
+    __slots__ = ('value', 'expires_at', 'compute_time')
+
+    def __init__(self, value, expires_at, compute_time):
+        self.value = value
+        self.expires_at = expires_at
+        self.compute_time = compute_time
+
+    def __getstate__(self):
+        return (self.value, self.expires_at, self.compute_time)
+
+    def __setstate__(self, state):
+        self.value, self.expires_at, self.compute_time = state
+
+    def is_expired(self, now):
+        return now >= self.expires_at
+
+    def should_recompute_early(self, now, beta):
+        """XFetch: now - compute_time * beta * log(rand) >= expires_at."""
+        return now - self.compute_time * beta * math.log(1.0 - random.random()) >= self.expires_at
+
+
+def _store(backend, key, value, compute_time, ttl, stale_ttl, negative_ttl):
+    if value is None:
+        ttl = negative_ttl
+    entry = CacheEntry(value, time.time() + ttl, compute_time)
+    backend.set(key, entry, ttl + stale_ttl)
+    return entry
+
+
+def _compute(backend, key, compute, ttl, stale_ttl, negative_ttl):
+    start = time.time()
+    value = compute()
+    _store(backend, key, value, time.time() - start, ttl, stale_ttl, negative_ttl)
+    return value
+
+
+def _wait_for(backend, key, lock_timeout):
+    """Poll the cache until another worker stores key, or give up (None)."""
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = backend.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_compute(key, compute, ttl, cache=None, stale_ttl=DEFAULT_STALE_TTL,
+                   negative_ttl=DEFAULT_NEGATIVE_TTL, lock_timeout=DEFAULT_LOCK_TIMEOUT,
+                   beta=DEFAULT_BETA):
+    """
+    Return the value cached under key, computing it with compute() when
+    needed (see module docstring).
+
+    - ttl: seconds the value is fresh.
+    - stale_ttl: extra seconds a stale value may be served while another
+      worker recomputes it.
+    - negative_ttl: seconds a None result stays cached.
+    - lock_timeout: seconds the recompute lock is held at most.
+    - beta: > 1 favours earlier recomputation, < 1 later. 0 disables it.
+    """
+    backend = cache or default_cache
+    lock_key = '{}:lock'.format(key)
+
+    entry = backend.get(key)
+    now = time.time()
+    if entry is not None:
+        if not entry.is_expired(now) and not entry.should_recompute_early(now, beta):
+            return entry.value
+        # Expired or elected for early refresh: one worker recomputes, the
+        # others keep serving what is cached.
+        if not backend.add(lock_key, 1, lock_timeout):
+            return entry.value
+        try:
+            return _compute(backend, key, compute, ttl, stale_ttl, negative_ttl)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('[cache] Could not refresh %s, serving the stale value', key)
+            return entry.value
+        finally:
+            backend.delete(lock_key)
+
+    # Cold cache: nothing to serve, wait for the worker computing it.
+    locked = backend.add(lock_key, 1, lock_timeout)
+    if not locked:
+        entry = _wait_for(backend, key, lock_timeout)
+        if entry is not None:
+            return entry.value
+    try:
+        return _compute(backend, key, compute, ttl, stale_ttl, negative_ttl)
+    finally:
+        if locked:
+            backend.delete(lock_key)
+
+
+def invalidate(key, cache=None):
+    """Drop key, next reader recomputes it."""
+    (cache or default_cache).delete(key)
@@ -0,0 +1,221 @@
+"""
+Two level cache backend.
+
+TieredCache keeps a small in-process LRU (L1) in front of a shared cache (L2,
+another entry of CACHES: Redis, Memcached, file or database based). Reads
+served by L1 skip the network hop, and every worker still shares the values
+through L2.
+
+L1 entries live L1_TIMEOUT seconds at most (keep it short, other workers'
+writes are only seen after it). Clearing the cache stores a new generation
+token in L2, every process compares it with its own at most every
+L1_TIMEOUT seconds and drops its L1 when it changed.
+
+    CACHES = {
+        'default': {
+            'BACKEND': '{{project_name}}.libs.cache_backends.TieredCache',
+            'OPTIONS': {
+                'L2_ALIAS': 'shared',
+                'L1_MAX_ENTRIES': 1000,
+                'L1_TIMEOUT': 5,
+            },
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': '127.0.0.1:11211',
+        },
+    }
+
+Hits and misses of each level are counted per process, see get_stats().
+
+add() goes straight to L2: libs.cache uses it as a lock (single flight,
+stale while revalidate), which needs an L2 whose add() is atomic among
+workers (Memcached, Redis). FileBasedCache checks then writes: a warning is
+logged and add() is only serialised between the threads of a process, two
+workers may still both get the lock.
+
+delete() and incr() evict the L1 of this process only: other workers serve
+the old value for at most L1_TIMEOUT seconds.
+"""
+import logging
+import pickle
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+log = logging.getLogger(__name__)
+
+DEFAULT_L1_MAX_ENTRIES = 1000
+DEFAULT_L1_TIMEOUT = 5
+GENERATION_KEY = 'tiered-cache:generation'
+# L2 backends whose add() is not atomic among processes.
+NON_ATOMIC_ADD_BACKENDS = (FileBasedCache, )
+
+# L1 stores and counters are shared by the threads of a process (Django
+# builds one backend instance per thread), keyed by the L2 alias (the
+# backend is not given its own alias, only its LOCATION).
+_stores = {}
+_stats = {}
+_lock = threading.Lock()
+_add_locks = {}
+
+
+class _LRUStore(object):
+    """Thread safe LRU of pickled values with an expiry time."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.generation = None
+        self.generation_checked_at = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, pickled = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout):
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, pickled)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache(BaseCache):
+    """In-process LRU (L1) in front of a shared cache (L2), see module docstring."""
+
+    def __init__(self, location, params):
+        super(TieredCache, self).__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options['L2_ALIAS']
+        self._l1_timeout = options.get('L1_TIMEOUT', DEFAULT_L1_TIMEOUT)
+        with _lock:
+            if self._l2_alias not in _stores:
+                self._warn_if_add_not_atomic()
+            self._store = _stores.setdefault(
+                self._l2_alias,
+                _LRUStore(options.get('L1_MAX_ENTRIES', DEFAULT_L1_MAX_ENTRIES)),
+            )
+            self._stats = _stats.setdefault(self._l2_alias, Counter())
+            self._add_lock = _add_locks.setdefault(self._l2_alias, threading.Lock())
+
+    def _warn_if_add_not_atomic(self):
+        if isinstance(self.l2, NON_ATOMIC_ADD_BACKENDS):
+            log.warning(
+                '[cache] L2 cache %r (%s) has no atomic add(): the locks of '
+                'libs.cache are only exclusive within a process.',
+                self._l2_alias, type(self.l2).__name__)
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_timeout_for(self, timeout):
+        """Seconds to keep a value set with timeout in L1, <= 0: not kept."""
+        # Relative timeout, get_backend_timeout() gives an expiry time.
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self._l1_timeout
+        return min(timeout, self._l1_timeout)
+
+    def _check_generation(self):
+        """Drop L1 when another process cleared the cache."""
+        store = self._store
+        now = time.monotonic()
+        if now - store.generation_checked_at < self._l1_timeout:
+            return
+        store.generation_checked_at = now
+        generation = self.l2.get(GENERATION_KEY)
+        if generation != store.generation:
+            store.clear()
+            store.generation = generation
+
+    def get(self, key, default=None, version=None):
+        l1_key = self.make_key(key, version=version)
+        self.validate_key(l1_key)
+        self._check_generation()
+
+        value = self._store.get(l1_key)
+        if value is not None:
+            self._stats['l1_hits'] += 1
+            return value
+        self._stats['l1_misses'] += 1
+
+        value = self.l2.get(key, version=version)
+        if value is None:
+            self._stats['l2_misses'] += 1
+            return default
+        self._stats['l2_hits'] += 1
+        self._store.set(l1_key, value, self._l1_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout=timeout, version=version)
+        l1_timeout = self._l1_timeout_for(timeout)
+        if l1_timeout > 0:
+            self._store.set(self.make_key(key, version=version), value, l1_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Delegated to L2: add is used for locks, it must be atomic among
+        # workers (see module docstring). The lock covers this process' threads.
+        with self._add_lock:
+            added = self.l2.add(key, value, timeout=timeout, version=version)
+        if added:
+            l1_timeout = self._l1_timeout_for(timeout)
+            if l1_timeout > 0:
+                self._store.set(self.make_key(key, version=version), value, l1_timeout)
+        return added
+
+    def delete(self, key, version=None):
+        # Other processes keep their L1 copy, see module docstring.
+        self._store.delete(self.make_key(key, version=version))
+        return self.l2.delete(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._store.delete(self.make_key(key, version=version))
+        return self.l2.incr(key, delta=delta, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, version=version) is not None
+
+    def clear(self):
+        self.l2.clear()
+        self.invalidate_l1()
+
+    def invalidate_l1(self):
+        """Make every process drop its L1, L2 is kept (e.g. after a deploy)."""
+        generation = uuid.uuid4().hex
+        self.l2.set(GENERATION_KEY, generation, timeout=None)
+        self._store.clear()
+        self._store.generation = generation
+
+    def get_stats(self):
+        """Hits and misses of L1 and L2 in this process."""
+        stats = dict(self._stats)
+        lookups = stats.get('l1_hits', 0) + stats.get('l1_misses', 0)
+        stats['l1_hit_ratio'] = stats.get('l1_hits', 0) / lookups if lookups else None
+        return stats
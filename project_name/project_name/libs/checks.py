@@ -9,18 +9,46 @@ Custom django checks.
     H007: Model has no verbose name plural.
     H008: Must set db_index explicitly on a ForeignKey field.
 
+Performance checks.
+    P001: Meta.ordering field has no index.
+    P002: PersistentModel has no index on "deleted".
+    P003: Filterset field has no index.
+    P004: Serializer traverses a relation not in the queryset select_related.
+
 NOTE on H008:
     This check forces the developer to explicitly set db_index on
     every ForeignKey field.  By making sure the developer is aware of that
     and making him decide if an index is required or not,
     you are left with only the indexes you really need!
+
+NOTE on speed:
+    Each models module is read and parsed once (not once per model), and the
+    resulting messages are stored in an on-disk cache keyed by the module's
+    path, mtime and size (setting MODEL_CHECKS_CACHE_FILE, None disables it).
+    When no models module changed, check_models does not parse anything.
+
+NOTE on P003 and P004:
+    They inspect the class based views reachable from ROOT_URLCONF that
+    declare a ``queryset`` attribute. Views building their queryset only in
+    get_queryset() are not checked.
 """
 import inspect
 import ast
+import json
+import os
+from collections import OrderedDict
 
 import django.apps
 import django.core.checks
+from django.conf import settings
 from django.db.models import FieldDoesNotExist
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework import relations, serializers
+
+from .models import PersistentModel
+
+# Bump when the checks change, so stale cached results are discarded.
+CHECKS_CACHE_VERSION = 1
 
 
 def get_argument(node, arg):
@@ -41,16 +69,19 @@ def is_gettext_node(node):
     return True
 
 
-def check_model(model):
+def check_model(model, class_node=None):
     """Check a single model.
+    class_node is the ast.ClassDef of the model, when the caller already
+    parsed its module. Otherwise the model source is parsed here.
     Yields (django.checks.CheckMessage)
     """
-    model_source = inspect.getsource(model)
-    model_node = ast.parse(model_source)
-    assert isinstance(model_node, ast.Module)
+    if class_node is None:
+        model_node = ast.parse(inspect.getsource(model))
+        assert isinstance(model_node, ast.Module)
+        class_node = model_node.body[0]
 
     class_meta = None
-    for node in model_node.body[0].body:  # type: ignore
+    for node in class_node.body:  # type: ignore
         if isinstance(node, ast.ClassDef):
             # class Meta
             if node.name == 'Meta':
@@ -183,16 +214,355 @@ def check_model(model):
             )
 
 
+def _class_nodes(module_node):
+    """Map class name -> first ast.ClassDef with that name in a module."""
+    nodes = {}
+    for node in ast.walk(module_node):
+        if isinstance(node, ast.ClassDef):
+            nodes.setdefault(node.name, node)
+    return nodes
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _serialize(message):
+    obj = message.obj
+    return {
+        'level': message.level,
+        'msg': message.msg,
+        'hint': message.hint,
+        'id': message.id,
+        'field': None if isinstance(obj, type) else obj.name,
+    }
+
+
+def _deserialize(data, model):
+    obj = model._meta.get_field(data['field']) if data['field'] else model
+    return django.core.checks.CheckMessage(
+        data['level'], data['msg'], hint=data['hint'], obj=obj, id=data['id'],
+    )
+
+
+def _load_cache(cache_file):
+    if not cache_file:
+        return {}
+    try:
+        with open(cache_file) as cache:
+            data = json.load(cache)
+    except (IOError, OSError, ValueError):
+        return {}
+    if data.get('version') != CHECKS_CACHE_VERSION:
+        return {}
+    return data.get('files', {})
+
+
+def _save_cache(cache_file, files):
+    if not cache_file:
+        return
+    tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, 'w') as cache:
+            json.dump({'version': CHECKS_CACHE_VERSION, 'files': files}, cache)
+        os.replace(tmp_file, cache_file)
+    except (IOError, OSError):
+        # A read-only checkout must not break manage.py, just skip caching.
+        pass
+
+
+def _check_module(path, models):
+    """Parse one models module and run check_model on each of its models."""
+    with open(path, encoding='utf-8') as source:
+        class_nodes = _class_nodes(ast.parse(source.read(), path))
+
+    results = {}
+    for model in models:
+        class_node = class_nodes.get(model.__name__)
+        messages = check_model(model, class_node) if class_node else check_model(model)
+        results[model._meta.label] = list(messages)
+    return results
+
+
 @django.core.checks.register(django.core.checks.Tags.models)
 def check_models(app_configs, **kwargs):
-    errors = []
+    cache_file = getattr(settings, 'MODEL_CHECKS_CACHE_FILE', None)
+    cached_files = _load_cache(cache_file)
+
+    # Group models by the module that defines them, to parse it only once.
+    models_by_file = OrderedDict()
     for app in django.apps.apps.get_app_configs():
         # Skip third party apps.
         if app.path.find('site-packages') > -1:
             continue
 
         for model in app.get_models():
-            for check_message in check_model(model):
-                errors.append(check_message)
+            path = inspect.getsourcefile(model)
+            models_by_file.setdefault(path, []).append(model)
+
+    errors = []
+    # Models whose source file cannot be located are checked uncached.
+    for model in models_by_file.pop(None, []):
+        errors.extend(check_model(model))
+
+    files = {}
+    for path, models in models_by_file.items():
+        signature = _file_signature(path)
+        labels = sorted(model._meta.label for model in models)
+        cached = cached_files.get(path)
+        if cached and cached['signature'] == signature and sorted(cached['models']) == labels:
+            for model in models:
+                messages = cached['models'][model._meta.label]
+                errors.extend(_deserialize(data, model) for data in messages)
+            files[path] = cached
+            continue
+
+        results = _check_module(path, models)
+        for model in models:
+            errors.extend(results[model._meta.label])
+        files[path] = {
+            'signature': signature,
+            'models': {
+                label: [_serialize(message) for message in messages]
+                for label, messages in results.items()
+            },
+        }
+
+    if files != cached_files:
+        _save_cache(cache_file, files)
+
+    return errors
+
+
+# ----------------------------------------------------------------------------
+#                    PERFORMANCE CHECKS
+# ----------------------------------------------------------------------------
+
+def _is_third_party(obj):
+    source_file = inspect.getsourcefile(obj) or ''
+    return source_file.find('site-packages') > -1
+
+
+def _local_models():
+    for app in django.apps.apps.get_app_configs():
+        # Skip third party apps.
+        if app.path.find('site-packages') > -1:
+            continue
+        for model in app.get_models():
+            yield model
+
+
+def _leading_index_fields(model):
+    """Names of the fields that are the first column of some index."""
+    meta = model._meta
+    names = set(
+        field.name for field in meta.concrete_fields
+        if field.db_index or field.unique or field.primary_key
+    )
+    for index in meta.indexes:
+        if index.fields:
+            names.add(index.fields[0].lstrip('-'))
+    for fields in tuple(meta.index_together) + tuple(meta.unique_together):
+        if fields:
+            names.add(fields[0])
+    return names
+
+
+def _has_deleted_index(model):
+    meta = model._meta
+    if meta.get_field('deleted').db_index:
+        return True
+    for index in meta.indexes:
+        if 'deleted' in [name.lstrip('-') for name in index.fields]:
+            return True
+        # Partial indexes (Django >= 2.2): Index(..., condition=Q(deleted=False))
+        condition = getattr(index, 'condition', None)
+        if condition is not None and 'deleted' in str(condition):
+            return True
+    return any('deleted' in fields for fields in meta.index_together)
+
+
+def check_model_performance(model):
+    """Index related checks on a single model.
+    Yields (django.checks.CheckMessage)
+    """
+    indexed = _leading_index_fields(model)
 
+    for ordering in model._meta.ordering:
+        # Expressions, random ordering and related lookups are not checked.
+        if not isinstance(ordering, str) or ordering == '?' or '__' in ordering:
+            continue
+        name = ordering.lstrip('-')
+        if name == 'pk':
+            continue
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.name not in indexed:
+            yield django.core.checks.Warning(
+                'Meta.ordering field "{}" has no index'.format(name),
+                hint='Set db_index on "{}" or add it to Meta.indexes, every '
+                     'unfiltered list sorts the whole table.'.format(name),
+                obj=model,
+                id='P001',
+            )
+
+    if issubclass(model, PersistentModel) and not _has_deleted_index(model):
+        yield django.core.checks.Warning(
+            'PersistentModel "{}" has no index on "deleted"'.format(model._meta.model_name),
+            hint='Every query through PersistentModelManager filters on '
+                 '"deleted". Add an index covering it (a partial index on '
+                 'deleted=False where the database supports it).',
+            obj=model,
+            id='P002',
+        )
+
+
+@django.core.checks.register(django.core.checks.Tags.models)
+def check_models_performance(app_configs, **kwargs):
+    errors = []
+    for model in _local_models():
+        errors.extend(check_model_performance(model))
+    return errors
+
+
+def iter_view_classes(patterns):
+    """Yield the class of every class based view reachable from patterns."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_view_classes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view_class = getattr(pattern.callback, 'cls', None) or \
+                getattr(pattern.callback, 'view_class', None)
+            if view_class is not None:
+                yield view_class
+
+
+def _filterset_fields(view_class):
+    fields = getattr(view_class, 'filterset_fields', None) or \
+        getattr(view_class, 'filter_fields', None)
+    filterset_class = getattr(view_class, 'filterset_class', None) or \
+        getattr(view_class, 'filter_class', None)
+    if not fields and filterset_class is not None:
+        fields = getattr(getattr(filterset_class, 'Meta', None), 'fields', None)
+    if not fields or isinstance(fields, str):  # e.g. '__all__'
+        return []
+    return list(fields)
+
+
+def _is_forward_relation(field):
+    return field.is_relation and (field.many_to_one or field.one_to_one) and \
+        field.concrete
+
+
+def _relation_path(model, source, loads_related):
+    """
+    Forward relations traversed to read source from an instance of model, as
+    a select_related lookup ('user__profile'), or None if there are none.
+    loads_related tells if the last relation object itself is read (nested
+    serializer, StringRelatedField, ...) or only its pk.
+    """
+    parts = source.split('.')
+    path = []
+    for position, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if not _is_forward_relation(field):
+            break
+        is_last = position == len(parts) - 1
+        if is_last and not loads_related:
+            break
+        path.append(part)
+        model = field.related_model
+    return '__'.join(path) or None
+
+
+def _is_select_related(queryset, lookup):
+    select_related = queryset.query.select_related
+    if select_related is True:
+        return True
+    if not select_related:
+        return False
+    for part in lookup.split('__'):
+        if part not in select_related:
+            return False
+        select_related = select_related[part]
+    return True
+
+
+def _serializer_relation_paths(serializer_class, model):
+    serializer = serializer_class()
+    for field in serializer.fields.values():
+        if field.source == '*' or field.write_only:
+            continue
+        if isinstance(field, (serializers.ListSerializer, relations.ManyRelatedField)):
+            # To-many relations need prefetch_related, not select_related.
+            continue
+        loads_related = isinstance(field, serializers.BaseSerializer) or (
+            isinstance(field, relations.RelatedField) and
+            not field.use_pk_only_optimization()
+        )
+        path = _relation_path(model, field.source, loads_related)
+        if path:
+            yield field.field_name, path
+
+
+def check_view_performance(view_class):
+    """Index and select_related checks on a view declaring a queryset.
+    Yields (django.checks.CheckMessage)
+    """
+    queryset = getattr(view_class, 'queryset', None)
+    if queryset is None:
+        return
+    model = queryset.model
+
+    indexed = _leading_index_fields(model)
+    for name in _filterset_fields(view_class):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if not field.is_relation and field.name not in indexed:
+            yield django.core.checks.Warning(
+                'Filterset field "{}" of {} has no index'.format(name, model._meta.label),
+                hint='Set db_index on "{}" or drop it from the filterset fields.'.format(name),
+                obj=view_class,
+                id='P003',
+            )
+
+    serializer_class = getattr(view_class, 'serializer_class', None)
+    if serializer_class is None or not issubclass(serializer_class, serializers.Serializer):
+        return
+    try:
+        paths = list(_serializer_relation_paths(serializer_class, model))
+    except Exception:  # pylint: disable=broad-except
+        # Serializers that need a context to build their fields are skipped.
+        return
+    for field_name, path in paths:
+        if not _is_select_related(queryset, path):
+            yield django.core.checks.Warning(
+                'Serializer field "{}" traverses "{}" without select_related'.format(
+                    field_name, path),
+                hint='Add .select_related(\'{}\') to the queryset of {}, '
+                     'otherwise each row costs one more query.'.format(
+                         path, view_class.__name__),
+                obj=view_class,
+                id='P004',
+            )
+
+
+@django.core.checks.register(django.core.checks.Tags.urls)
+def check_views_performance(app_configs, **kwargs):
+    errors = []
+    seen = set()
+    for view_class in iter_view_classes(get_resolver().url_patterns):
+        if view_class in seen or _is_third_party(view_class):
+            continue
+        seen.add(view_class)
+        errors.extend(check_view_performance(view_class))
     return errors
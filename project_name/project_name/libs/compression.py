@@ -0,0 +1,210 @@
+"""
+Response compression.
+
+CompressionMiddleware compresses responses with the best encoding the client
+accepts among COMPRESSION_ENCODINGS (in order of preference):
+    - 'br': brotli, needs the brotli package,
+    - 'zstd': Zstandard, needs the zstandard package,
+    - 'gzip': always available.
+Encodings whose package is not installed are skipped.
+
+Levels (COMPRESSION_LEVELS) favour latency over ratio: JSON compresses well
+at low levels already, the highest ones cost much more CPU for a few %.
+
+Not compressed:
+    - responses smaller than COMPRESSION_MIN_SIZE bytes,
+    - responses already encoded (Content-Encoding) or of an already
+      compressed type (images, archives, ...), see INCOMPRESSIBLE_TYPES,
+    - responses with Cache-Control: no-transform.
+
+Streaming responses (StreamingHttpResponse, e.g. the limit=0 lists of
+CustomPagination) are compressed chunk by chunk, each chunk being flushed so
+the client receives data as soon as the view produces it.
+
+Add it to MIDDLEWARE before any middleware reading or changing the body:
+    '{{project_name}}.libs.compression.CompressionMiddleware',
+"""
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_ENCODINGS = ('br', 'zstd', 'gzip')
+DEFAULT_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 5}
+INCOMPRESSIBLE_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/zip', 'application/gzip', 'application/x-gzip',
+    'application/x-bzip2', 'application/x-xz', 'application/x-7z-compressed',
+    'application/x-rar-compressed', 'application/pdf', 'application/octet-stream',
+)
+SVG_TYPE = 'image/svg+xml'
+
+_split_re = re.compile(r'\s*,\s*')
+
+
+def parse_accept_encoding(header):
+    """{encoding: q} of an Accept-Encoding header."""
+    accepted = {}
+    for item in _split_re.split(header.strip()):
+        if not item:
+            continue
+        encoding, _, params = item.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[encoding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header, encodings):
+    """First of encodings the client accepts, None if none."""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _GzipCompressor(object):
+
+    def __init__(self, level):
+        # wbits 16 + MAX_WBITS: gzip header and trailer.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor(object):
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class _ZstdCompressor(object):
+
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+COMPRESSORS = {'gzip': _GzipCompressor}
+if brotli is not None:
+    COMPRESSORS['br'] = _BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS['zstd'] = _ZstdCompressor
+
+
+def compress(data, encoding, level):
+    compressor = COMPRESSORS[encoding](level)
+    return compressor.compress(data) + compressor.finish()
+
+
+def compress_stream(chunks, encoding, level):
+    compressor = COMPRESSORS[encoding](level)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding'):
+        return False
+    if 'no-transform' in response.get('Cache-Control', ''):
+        return False
+    content_type = response.get('Content-Type', '').lower()
+    return content_type.startswith(SVG_TYPE) or not content_type.startswith(INCOMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware(object):
+    """Compresses responses with br, zstd or gzip, see module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+        self.encodings = [
+            encoding for encoding in getattr(settings, 'COMPRESSION_ENCODINGS', DEFAULT_ENCODINGS)
+            if encoding in COMPRESSORS
+        ]
+        self.levels = dict(DEFAULT_LEVELS, **getattr(settings, 'COMPRESSION_LEVELS', {}))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        # The representation depends on Accept-Encoding, even when it is not
+        # compressed for this request.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level)
+            # Length of the compressed stream is unknown.
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Same bytes are not sent anymore, a strong ETag must become weak.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -1,3 +1,10 @@
 # -*- coding: utf-8 -*-
 
 # Put in here all of some of your python cron functions
+# Register them for `manage.py runcrons` (see libs/scheduler.py):
+#
+# from .scheduler import cron
+#
+# @cron('*/5 * * * *', jitter=30)
+# def refresh_stats():
+#     ...
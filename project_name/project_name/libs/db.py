@@ -0,0 +1,54 @@
+"""
+Health checks of persistent database connections.
+
+With CONN_MAX_AGE > 0 a connection is reused by the following requests of the
+same worker. Django only tests it again when an error occurred on it, so a
+connection dropped by the server (restart, failover, idle timeout) makes the
+next request fail. ConnectionHealthCheckMiddleware pings every open
+connection before the request uses it, at most once every
+DB_HEALTH_CHECK_INTERVAL seconds, and closes it when it is not usable, so
+Django opens a new one.
+
+Add it to MIDDLEWARE, before any middleware using the database:
+    '{{project_name}}.libs.db.ConnectionHealthCheckMiddleware',
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+log = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+# Attribute of the connection wrapper with the time of its last check.
+CHECKED_AT_ATTR = '_health_checked_at'
+
+
+def check_connection(connection, interval):
+    """Close connection if it is open, due for a check and not usable."""
+    if connection.connection is None or connection.in_atomic_block:
+        return
+    now = time.monotonic()
+    if now - getattr(connection, CHECKED_AT_ATTR, 0) < interval:
+        return
+    setattr(connection, CHECKED_AT_ATTR, now)
+    if not connection.is_usable():
+        log.warning('[db] Connection "%s" is not usable anymore, closing it', connection.alias)
+        connection.close()
+
+
+class ConnectionHealthCheckMiddleware(object):
+    """
+    Middleware checking persistent connections before the view uses them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.interval = getattr(settings, 'DB_HEALTH_CHECK_INTERVAL',
+                                DEFAULT_HEALTH_CHECK_INTERVAL)
+
+    def __call__(self, request):
+        for connection in connections.all():
+            check_connection(connection, self.interval)
+        return self.get_response(request)
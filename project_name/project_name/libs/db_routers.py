@@ -0,0 +1,143 @@
+"""
+Read replica routing.
+
+ReplicaRouter sends reads to one of DATABASE_REPLICAS only when the code
+runs inside replica_reads() (the viewsets of libs/views.py do it for their
+safe actions, see APIPaginatedViewSet.read_replica_actions). Everything else
+(writes, migrations, crons, reads outside a viewset) uses 'default'.
+
+Read your writes: when a user writes (any db_for_write during one of their
+requests, see libs.global_request), they are pinned to 'default' for
+REPLICA_STICKY_SECONDS, shared by all workers through the cache.
+
+Lag: a replica lagging more than REPLICA_MAX_LAG_SECONDS behind (checked at
+most every REPLICA_LAG_CHECK_INTERVAL seconds per process), or failing to
+answer, is skipped until the next check.
+
+    DATABASE_ROUTERS = ['{{project_name}}.libs.db_routers.ReplicaRouter']
+    DATABASE_REPLICAS = ['replica']
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .global_request import get_current_request, get_current_user
+
+log = logging.getLogger(__name__)
+
+DEFAULT_STICKY_SECONDS = 10
+DEFAULT_MAX_LAG_SECONDS = 5
+DEFAULT_LAG_CHECK_INTERVAL = 5
+# Attribute of the request telling its writes were already recorded.
+PINNED_ATTR = '_pinned_to_primary'
+
+LAG_QUERY = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+           END
+"""
+
+_state = threading.local()
+# alias -> (checked_at, healthy)
+_replica_health = {}
+_replica_health_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _pin_key(user_id):
+    return 'replica-pin:{}'.format(user_id)
+
+
+def is_pinned_to_primary(user):
+    """True if user wrote recently and must read from 'default'."""
+    if user is None or user.pk is None:
+        return False
+    return cache.get(_pin_key(user.pk)) is not None
+
+
+def pin_to_primary(user):
+    cache.set(_pin_key(user.pk), 1, _setting('REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS))
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Allow (or forbid) the reads inside the block to go to a replica."""
+    previous = getattr(_state, 'use_replica', False)
+    _state.use_replica = enabled
+    try:
+        yield
+    finally:
+        _state.use_replica = previous
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind 'default' (0 for non PostgreSQL)."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_QUERY)
+        lag = cursor.fetchone()[0]
+    return float(lag or 0)
+
+
+def is_replica_healthy(alias):
+    now = time.monotonic()
+    interval = _setting('REPLICA_LAG_CHECK_INTERVAL', DEFAULT_LAG_CHECK_INTERVAL)
+    with _replica_health_lock:
+        checked_at, healthy = _replica_health.get(alias, (None, True))
+        if checked_at is not None and now - checked_at < interval:
+            return healthy
+        # Mark as checked right away, so concurrent threads do not check too.
+        _replica_health[alias] = (now, healthy)
+
+    try:
+        lag = replica_lag(alias)
+        healthy = lag <= _setting('REPLICA_MAX_LAG_SECONDS', DEFAULT_MAX_LAG_SECONDS)
+        if not healthy:
+            log.warning('[replicas] %s is %.1fs behind, reading from primary', alias, lag)
+    except DatabaseError as err:
+        healthy = False
+        log.warning('[replicas] %s not available, reading from primary: %s', alias, err)
+
+    with _replica_health_lock:
+        _replica_health[alias] = (now, healthy)
+    return healthy
+
+
+class ReplicaRouter(object):
+    """Database router sending viewset reads to replicas, see module docstring."""
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'use_replica', False):
+            return DEFAULT_DB_ALIAS
+        replicas = [
+            alias for alias in _setting('DATABASE_REPLICAS', []) if is_replica_healthy(alias)
+        ]
+        if not replicas:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        request = get_current_request()
+        user = get_current_user()
+        if user is not None and not getattr(request, PINNED_ATTR, False):
+            setattr(request, PINNED_ATTR, True)
+            pin_to_primary(user)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in _setting('DATABASE_REPLICAS', [])
@@ -1,3 +1,133 @@
 # -*- coding: utf-8 -*-
 
 # Put in here all of some of your custom decorators
+import datetime
+import hashlib
+import uuid
+from decimal import Decimal
+from functools import wraps
+
+from django.db import models
+
+from .cache import get_or_compute
+from .global_request import get_current_request
+
+# Attribute of the request object holding the @request_cached values.
+REQUEST_CACHE_ATTR = '_request_cache'
+
+
+def _call_key(func, args, kwargs):
+    return (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+
+def request_cached(func):
+    """
+    Memoise the result of func for the lifetime of the current request (see
+    libs.global_request). Outside of a request (crons, shell) or with
+    unhashable arguments the function is just called.
+
+        @request_cached
+        def get_user_permissions(user_id):
+            ...
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        request = get_current_request()
+        if request is None:
+            return func(*args, **kwargs)
+        try:
+            key = _call_key(func, args, kwargs)
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        values = getattr(request, REQUEST_CACHE_ATTR, None)
+        if values is None:
+            values = {}
+            setattr(request, REQUEST_CACHE_ATTR, values)
+        if key not in values:
+            values[key] = func(*args, **kwargs)
+        return values[key]
+    return wrapper
+
+
+# Arguments whose repr identifies the value, usable by default_cache_key.
+KEY_ARGUMENT_TYPES = (str, bytes, int, float, Decimal, uuid.UUID,
+                      datetime.date, datetime.time, datetime.timedelta)
+
+
+def _key_part(value):
+    if value is None or isinstance(value, KEY_ARGUMENT_TYPES):
+        return value
+    if isinstance(value, models.Model):
+        if value.pk is None:
+            raise TypeError('Unsaved {!r} can not be part of a cache key.'.format(value))
+        return ('model', value._meta.label, value.pk)
+    if isinstance(value, list):
+        return [_key_part(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_key_part(item) for item in value)
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted(
+            ((_key_part(name), _key_part(item)) for name, item in value.items()), key=repr)))
+    if isinstance(value, (set, frozenset)):
+        return ('set', tuple(sorted((_key_part(item) for item in value), key=repr)))
+    raise TypeError(
+        'No default cache key for {} arguments, give @cached a key function.'.format(
+            type(value).__name__))
+
+
+def default_cache_key(func, args, kwargs):
+    """
+    Key built from the function path and its arguments: primitives, dates,
+    UUIDs, model instances (label and pk) and lists, tuples, dicts and sets
+    of them. TypeError for any other argument, its repr may not identify it.
+    """
+    parts = (_key_part(args), _key_part(kwargs))
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return 'cached:{}.{}:{}'.format(func.__module__, func.__qualname__, digest)
+
+
+def cached(ttl, key=None, cache=None, **options):
+    """
+    Memoise the result of the function in the Django cache for `ttl` seconds,
+    through libs.cache.get_or_compute: stampede protection (single flight
+    lock, early recomputation, stale while revalidate) and None results cached
+    for a shorter time.
+
+    - key: callable receiving the function arguments and returning the cache
+      key. Defaults to default_cache_key, required for other arguments (self
+      of a method, querysets, ...).
+    - cache: cache backend, defaults to django.core.cache.cache.
+    - options: stale_ttl, negative_ttl, lock_timeout, beta of get_or_compute.
+
+        @cached(60 * 5, key=lambda zone_id: 'zone-stats:{}'.format(zone_id))
+        def zone_stats(zone_id):
+            ...
+    """
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else default_cache_key(func, args, kwargs)
+            return get_or_compute(
+                cache_key, lambda: func(*args, **kwargs), ttl, cache=cache, **options
+            )
+        return wrapper
+    return decorate
+
+
+def query_budget(max_queries=None, max_query_time_ms=None):
+    """
+    Class decorator declaring the query budget of a view, enforced by
+    libs.query_budget.QueryBudgetMiddleware. Both arguments accept an int or
+    a dict by viewset action.
+
+        @query_budget(max_queries={'list': 5, 'retrieve': 3})
+        class InvoiceViewSet(APIViewSet):
+            ...
+    """
+    def decorate(view_class):
+        view_class.max_queries = max_queries
+        view_class.max_query_time_ms = max_query_time_ms
+        return view_class
+    return decorate
@@ -3,13 +3,16 @@ Library with some generic functions specific for this project
 """
 # -*- coding: utf-8 -*-
 import string
-from slugify import slugify
 
 from datetime import datetime
 from random import choice, randint
 
+from .lazy import lazy_import
 from .shortuuid import encode as _suencode
 
+# Imported on first use: only the slug functions need it.
+slugify = lazy_import('slugify')
+
 # logging.basicConfig(level=logging.DEBUG,
 #                     format='%(asctime)s %(levelname)-8s %(message)s',
 #                     datefmt='%a, %d %b %Y %H:%M:%S',
@@ -95,7 +98,7 @@ def slug_generator(uuid,title):
     """
     return "{title_slug}-{hashid}".format(
             hashid=_suencode(uuid),
-            title_slug=slugify(title[:128])
+            title_slug=slugify.slugify(title[:128])
         )
 
 
@@ -120,7 +123,7 @@ def slug_string_generator(instance, new_slug=None):
     if new_slug is not None:
         slug = new_slug
     else:
-        slug = slugify(instance.title)
+        slug = slugify.slugify(instance.title)
 
     Klass = instance.__class__
     qs_exists = Klass.objects.filter(slug=slug).exists()
@@ -138,7 +141,7 @@ def slug_generator_old(instance):
     """
     return "{title_slug}-{hashid}".format(
             hashid=_suencode(instance.id),
-            title_slug=slugify(instance.title[:128])
+            title_slug=slugify.slugify(instance.title[:128])
         )
 
 
@@ -0,0 +1,34 @@
+"""
+Lazy imports.
+
+lazy_import('slugify') returns the module without executing it: the import
+really happens on the first attribute access (importlib.util.LazyLoader).
+Modules needing a heavy dependency in a few functions only (helpers, ...)
+stay cheap to import, which matters for management commands and crons that
+never call those functions.
+
+    slugify = lazy_import('slugify')
+
+    def slug_generator(title):
+        return slugify.slugify(title)
+
+A missing module still raises ImportError right away.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Module `name`, executed on first attribute access."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError('No module named {!r}'.format(name), name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
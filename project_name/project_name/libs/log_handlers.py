@@ -0,0 +1,176 @@
+"""
+Non blocking logging.
+
+configure_logging is used as LOGGING_CONFIG. It applies LOGGING with
+dictConfig and then moves the handlers listed in LOGGING['queue']['handlers']
+(the rotating files) off the calling thread: each of them is replaced by a
+BoundedQueueHandler, and a QueueListener thread does the actual writing and
+rotation. Request threads only pay for putting the record in a queue.
+
+    LOGGING['queue'] = {
+        'handlers': ['reqfile', 'production_file'],
+        'maxsize': 10000,          # records waiting to be written
+        'policy': 'drop_new',      # or 'drop_oldest', when the queue is full
+    }
+
+When the queue is full records are dropped instead of blocking the request,
+and the number of dropped records is reported on stderr.
+
+JsonFormatter writes one JSON object per line, for the log pipeline.
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.config
+import os
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+POLICY_DROP_NEW = 'drop_new'
+POLICY_DROP_OLDEST = 'drop_oldest'
+DEFAULT_QUEUE_SIZE = 10000
+# Seconds between two reports of dropped records.
+DROP_REPORT_INTERVAL = 60
+
+_listeners = []
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one line JSON objects."""
+
+    def format(self, record):
+        document = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            document['exception'] = record.exc_text
+        return json.dumps(document, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler on a bounded queue that never blocks: when it is full the
+    new record (drop_new) or the oldest waiting one (drop_oldest) is dropped.
+    """
+
+    def __init__(self, record_queue, policy=POLICY_DROP_NEW):
+        super(BoundedQueueHandler, self).__init__(record_queue)
+        self.policy = policy
+        self.dropped = 0
+        self._reported_at = 0
+
+    def prepare(self, record):
+        # Render message and traceback now: the record crosses threads, and
+        # args may be mutated (or not picklable) by then. The record is
+        # copied: the other handlers of the logger still get the original.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.policy == POLICY_DROP_OLDEST:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    pass
+            self._dropped_one()
+
+    def _dropped_one(self):
+        self.dropped += 1
+        now = time.monotonic()
+        if now - self._reported_at >= DROP_REPORT_INTERVAL:
+            self._reported_at = now
+            sys.stderr.write('[logging] queue full, {} log records dropped so far\n'.format(
+                self.dropped))
+
+
+class _Listener(QueueListener):
+    """QueueListener waiting for room in a full queue to stop."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _queue_handler_for(handler, maxsize, policy):
+    handler_queue = queue.Queue(maxsize)
+    queue_handler = BoundedQueueHandler(handler_queue, policy)
+    # Level and filters are applied before enqueueing too, so records the
+    # file handler would discard do not take space in the queue.
+    queue_handler.setLevel(handler.level)
+    queue_handler.filters = list(handler.filters)
+
+    listener = _Listener(handler_queue, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return queue_handler
+
+
+def _all_loggers():
+    yield logging.getLogger()
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger):
+            yield logger
+
+
+def stop_listeners():
+    """Flush and stop the writer threads."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def configure_logging(logging_settings):
+    """LOGGING_CONFIG callable: dictConfig plus queued handlers."""
+    logging_settings = dict(logging_settings)
+    queue_settings = logging_settings.pop('queue', None) or {}
+    logging.config.dictConfig(logging_settings)
+
+    queued_names = set(queue_settings.get('handlers', ()))
+    if not queued_names:
+        return
+
+    stop_listeners()
+    maxsize = queue_settings.get('maxsize', DEFAULT_QUEUE_SIZE)
+    policy = queue_settings.get('policy', POLICY_DROP_NEW)
+    replacements = {}
+    for logger in _all_loggers():
+        for handler in list(logger.handlers):
+            if handler.get_name() not in queued_names:
+                continue
+            if handler not in replacements:
+                replacements[handler] = _queue_handler_for(handler, maxsize, policy)
+            logger.removeHandler(handler)
+            logger.addHandler(replacements[handler])
+
+
+def _restart_listeners():
+    # Threads do not survive fork(): workers forked from a preloaded master
+    # (gunicorn --preload) need their own writer threads.
+    for listener in _listeners:
+        listener._thread = None  # pylint: disable=protected-access
+        listener.start()
+
+
+atexit.register(stop_listeners)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listeners)
@@ -0,0 +1,77 @@
+"""
+Report the connections opened to the PostgreSQL database and their churn.
+
+Reads pg_stat_activity, so it shows the connections of every worker, not
+only the ones of this process:
+
+    $ python manage.py db_connections_report
+    $ python manage.py db_connections_report --database default --recent 60
+
+A high number of connections younger than --recent seconds means workers
+keep opening new connections: check CONN_MAX_AGE or the pool backend
+({{project_name}}.db_backends.postgresql_pool).
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+ACTIVITY_QUERY = """
+    SELECT coalesce(application_name, ''), coalesce(client_addr::text, 'local'),
+           coalesce(state, 'unknown'),
+           extract(epoch FROM now() - backend_start)
+      FROM pg_stat_activity
+     WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+AGE_BUCKETS = (10, 60, 600, 3600)
+
+
+class Command(BaseCommand):
+    help = 'Report database connections by state, client and age (connection churn).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias.')
+        parser.add_argument('--recent', type=int, default=60,
+                            help='Connections younger than this (seconds) count as churn.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError('Only PostgreSQL databases are supported.')
+
+        with connection.cursor() as cursor:
+            cursor.execute(ACTIVITY_QUERY)
+            rows = cursor.fetchall()
+
+        by_state, by_client, by_age = {}, {}, {bucket: 0 for bucket in AGE_BUCKETS}
+        older = recent = 0
+        for application, client, state, age in rows:
+            by_state[state] = by_state.get(state, 0) + 1
+            client_key = '{} ({})'.format(client, application or '-')
+            by_client[client_key] = by_client.get(client_key, 0) + 1
+            for bucket in AGE_BUCKETS:
+                if age < bucket:
+                    by_age[bucket] += 1
+                    break
+            else:
+                older += 1
+            if age < options['recent']:
+                recent += 1
+
+        self.stdout.write('Connections: {}'.format(len(rows)))
+        self.stdout.write('\nBy state:')
+        for state, count in sorted(by_state.items()):
+            self.stdout.write('  {:<30} {:>6}'.format(state, count))
+        self.stdout.write('\nBy client:')
+        for client, count in sorted(by_client.items(), key=lambda item: -item[1]):
+            self.stdout.write('  {:<30} {:>6}'.format(client, count))
+        self.stdout.write('\nBy age:')
+        for bucket in AGE_BUCKETS:
+            self.stdout.write('  {:<30} {:>6}'.format('< {}s'.format(bucket), by_age[bucket]))
+        self.stdout.write('  {:<30} {:>6}'.format('>= {}s'.format(AGE_BUCKETS[-1]), older))
+
+        message = '\n{} of {} connections opened in the last {}s'.format(
+            recent, len(rows), options['recent'])
+        if rows and recent * 2 > len(rows):
+            self.stdout.write(
+                self.style.WARNING(message + ': high churn, are connections reused?'))
+        else:
+            self.stdout.write(message)
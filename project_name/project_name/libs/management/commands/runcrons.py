@@ -0,0 +1,79 @@
+"""
+Run the @cron jobs (libs/scheduler.py) in this process:
+
+    $ python manage.py runcrons                  # runs forever, every minute
+    $ python manage.py runcrons --workers 8 --processes
+    $ python manage.py runcrons --once           # the jobs due now, then exit
+    $ python manage.py runcrons --run myapp.cronjobs.refresh_stats
+    $ python manage.py runcrons --list
+
+--once can be called every minute by the system cron instead of running
+forever: one Django startup per minute for every job, instead of one per job.
+"""
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ...scheduler import Runner, discover_jobs, run_job
+
+DEFAULT_WORKERS = 4
+
+
+class Command(BaseCommand):
+    help = 'Run the registered cron jobs on a thread (or process) pool.'
+    # Started every minute with --once: no system checks at startup.
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            default=getattr(settings, 'CRON_WORKERS', DEFAULT_WORKERS),
+                            help='Jobs running at the same time.')
+        parser.add_argument('--processes', action='store_true',
+                            help='Run the jobs in processes instead of threads.')
+        parser.add_argument('--once', action='store_true',
+                            help='Run the jobs due this minute, wait for them and exit.')
+        parser.add_argument('--run', metavar='JOB', help='Run this job now (no jitter) and exit.')
+        parser.add_argument('--list', action='store_true', help='List the jobs and exit.')
+
+    def handle(self, *args, **options):
+        jobs = discover_jobs()
+
+        if options['list']:
+            for job in jobs.values():
+                self.stdout.write('{:<20} jitter {:>4}s  lock {:<5} {}'.format(
+                    str(job.schedule), job.jitter, job.lock, job.name))
+            return
+
+        if options['run']:
+            if options['run'] not in jobs:
+                raise CommandError('Unknown job "{}", see --list.'.format(options['run']))
+            outcome = run_job(options['run'], apply_jitter=False)
+            self.stdout.write(outcome)
+            if outcome == 'failure':
+                raise CommandError('Job "{}" failed, see the crons log.'.format(options['run']))
+            return
+
+        if not jobs:
+            raise CommandError('No cron job registered.')
+
+        # Forked workers must not share this process' connections.
+        connections.close_all()
+        executor_class = ProcessPoolExecutor if options['processes'] else ThreadPoolExecutor
+        with executor_class(max_workers=options['workers']) as executor:
+            runner = Runner(executor)
+            if options['once']:
+                runner.tick()
+                wait(runner.running.values())
+                return
+
+            def stop(signum, frame):
+                runner.stop()
+            signal.signal(signal.SIGTERM, stop)
+            signal.signal(signal.SIGINT, stop)
+            self.stdout.write('Running {} jobs with {} workers.'.format(
+                len(jobs), options['workers']))
+            # Leaving the executor waits for the running jobs.
+            runner.run_forever()
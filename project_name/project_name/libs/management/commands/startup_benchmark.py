@@ -0,0 +1,87 @@
+"""
+Measure how long management commands take to start.
+
+Each command is run --rounds times in a new process (python manage.py ...),
+wall time is reported. Crons run every minute pay this startup each time:
+
+    $ python manage.py startup_benchmark
+    $ python manage.py startup_benchmark --commands "version;check;crontab show" --rounds 10
+    $ python manage.py startup_benchmark --output startup.json --baseline old.json
+
+'version' is close to the bare cost of django.setup() (settings, apps),
+compare it with the cron commands. See also `manage.py warmup
+--import-report` to find the modules to import lazily.
+"""
+import json
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from os.path import join
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_COMMANDS = 'version;check;crontab show'
+
+
+def time_command(argv, rounds, env):
+    """Wall times (ms) of `rounds` runs of argv."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        process = subprocess.run(
+            argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env,
+            universal_newlines=True, check=False,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        if process.returncode:
+            raise CommandError('"{}" failed:\n{}'.format(' '.join(argv), process.stderr[-2000:]))
+    return timings
+
+
+class Command(BaseCommand):
+    help = 'Time the startup of management commands, each in a new process.'
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('--commands', default=DEFAULT_COMMANDS,
+                            help='Semicolon separated commands (with their arguments).')
+        parser.add_argument('--rounds', type=int, default=5, help='Runs per command.')
+        parser.add_argument('--output', help='Write the results to this JSON file.')
+        parser.add_argument('--baseline', help='Compare with the results in this JSON file.')
+
+    def handle(self, *args, **options):
+        manage_py = join(settings.SITE_ROOT, 'manage.py')
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        commands = [command.strip() for command in options['commands'].split(';')
+                    if command.strip()]
+
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        results = {}
+        self.stdout.write('  {:<30} {:>10} {:>10} {:>10}'.format(
+            'command', 'min ms', 'median ms', 'baseline'))
+        for command in commands:
+            timings = time_command(
+                [sys.executable, manage_py] + shlex.split(command), options['rounds'], env)
+            results[command] = {
+                'rounds': options['rounds'],
+                'min_ms': round(min(timings), 1),
+                'median_ms': round(statistics.median(timings), 1),
+            }
+            previous = baseline.get(command, {}).get('median_ms')
+            self.stdout.write('  {:<30} {:>10.1f} {:>10.1f} {:>10}'.format(
+                command, results[command]['min_ms'], results[command]['median_ms'],
+                '' if previous is None else '{:+.0%}'.format(
+                    results[command]['median_ms'] / previous - 1)))
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump(results, output_file, indent=2, sort_keys=True)
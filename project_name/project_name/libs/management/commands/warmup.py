@@ -0,0 +1,56 @@
+"""
+Run the warm up steps of libs/warmup.py and report their cost:
+
+    $ python manage.py warmup
+    $ python manage.py warmup --import-report --top 30 --sort self
+
+--import-report runs the warm up again in a python -X importtime subprocess
+and lists the most expensive imports: candidates for lazy imports, or for
+the preload of the master.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from ...warmup import WARMUP_STEPS, import_time_report, warm_up
+
+
+class Command(BaseCommand):
+    help = 'Warm up the application (imports, urls, serializers, ...) and time it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip', default='',
+                            help='Comma separated steps not to run, among: {}.'.format(
+                                ', '.join(WARMUP_STEPS)))
+        parser.add_argument('--import-report', action='store_true',
+                            help='Report the import time of the modules (python -X importtime).')
+        parser.add_argument('--top', type=int, default=20, help='Modules in the import report.')
+        parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative',
+                            help='Order of the import report.')
+
+    def handle(self, *args, **options):
+        skip = [name for name in options['skip'].split(',') if name]
+        unknown = set(skip) - set(WARMUP_STEPS)
+        if unknown:
+            raise CommandError('Unknown steps: {}'.format(', '.join(sorted(unknown))))
+
+        timings = warm_up(skip=skip)
+        for name, seconds, summary in timings:
+            self.stdout.write('  {:<15} {:>8.3f}s  {}'.format(name, seconds, summary))
+        self.stdout.write('  {:<15} {:>8.3f}s'.format('total', sum(t[1] for t in timings)))
+
+        if not options['import_report']:
+            return
+
+        try:
+            modules = import_time_report(skip=skip)
+        except RuntimeError as err:
+            raise CommandError(str(err))
+        index = 0 if options['sort'] == 'self' else 1
+        ranked = sorted(modules.items(), key=lambda item: -item[1][index])
+        total_self = sum(self_us for self_us, _ in modules.values())
+
+        self.stdout.write('\nImports: {} modules, {:.3f}s (self time)'.format(
+            len(modules), total_self / 1e6))
+        self.stdout.write('  {:>10} {:>12}  {}'.format('self ms', 'cumulative ms', 'module'))
+        for module, (self_us, cumulative_us) in ranked[:options['top']]:
+            self.stdout.write('  {:>10.1f} {:>12.1f}  {}'.format(
+                self_us / 1e3, cumulative_us / 1e3, module))
@@ -0,0 +1,66 @@
+"""
+Content negotiation fast path.
+
+FastContentNegotiation skips DRF's media type parsing for the requests
+almost every client sends (no Accept header, */* or application/json, no
+?format=): the first renderer of the view is used right away. Anything else
+(msgpack, ?format=, indent=4, ...) goes through DefaultContentNegotiation.
+
+The browsable API is not among the renderers of the production profile. It
+is only imported and offered to staff users asking for HTML (a browser, or
+?format=api), see BROWSABLE_API_RENDERER.
+
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        '{{project_name}}.libs.renderers.FastJSONRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_CONTENT_NEGOTIATION_CLASS'] = \\
+        '{{project_name}}.libs.negotiation.FastContentNegotiation'
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer
+
+DEFAULT_BROWSABLE_API_RENDERER = 'rest_framework.renderers.BrowsableAPIRenderer'
+# Accept headers answered with the first renderer, no negotiation.
+ANY_MEDIA_TYPE = ('', '*/*')
+
+_browsable_renderer_class = None
+
+
+def get_browsable_renderer_class():
+    """BROWSABLE_API_RENDERER class, imported on first use."""
+    global _browsable_renderer_class
+    if _browsable_renderer_class is None:
+        _browsable_renderer_class = import_string(
+            getattr(settings, 'BROWSABLE_API_RENDERER', DEFAULT_BROWSABLE_API_RENDERER))
+    return _browsable_renderer_class
+
+
+def wants_html(request, format_query):
+    if format_query:
+        return format_query == 'api'
+    return 'text/html' in request.META.get('HTTP_ACCEPT', '')
+
+
+def is_staff(request):
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+
+class FastContentNegotiation(DefaultContentNegotiation):
+    """DefaultContentNegotiation with a JSON fast path, see module docstring."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        format_query = format_suffix or request.query_params.get(self.settings.URL_FORMAT_OVERRIDE)
+        if not format_query:
+            accept = request.META.get('HTTP_ACCEPT', '*/*').strip()
+            renderer = renderers[0]
+            if accept in ANY_MEDIA_TYPE or accept == renderer.media_type:
+                return renderer, renderer.media_type
+
+        if wants_html(request, format_query) and is_staff(request) and \
+                not any(isinstance(renderer, BrowsableAPIRenderer) for renderer in renderers):
+            renderers = list(renderers) + [get_browsable_renderer_class()()]
+        return super(FastContentNegotiation, self).select_renderer(
+            request, renderers, format_suffix)
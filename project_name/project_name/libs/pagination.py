@@ -3,12 +3,18 @@
 """
 from collections import OrderedDict
 
+from django.http import StreamingHttpResponse
 from rest_framework import pagination as drf_pagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
 
 class CustomPagination(drf_pagination.LimitOffsetPagination):
     """Custom pagination class for Django DRF"""
+    # limit=0 lists rendered as JSON are streamed, rows by chunks of
+    # stream_chunk_size, instead of being rendered in one piece.
+    stream_unlimited = True
+    stream_chunk_size = 500
 
     def __init__(self, *args, **kwargs):
         """Initialize class"""
@@ -59,8 +65,44 @@ class CustomPagination(drf_pagination.LimitOffsetPagination):
         if not self.count:
             self.count = len(data)
         document = self._make_response_document(data, extra_meta)
+        if self.limit == 0 and self.stream_unlimited:
+            renderer = self._get_streaming_renderer()
+            if renderer is not None:
+                # Same header as Response.rendered_content.
+                content_type = renderer.media_type
+                if renderer.charset:
+                    content_type = '{}; charset={}'.format(content_type, renderer.charset)
+                return StreamingHttpResponse(
+                    self._stream_document(document, renderer),
+                    content_type=content_type,
+                )
         return Response(document)
 
+    def _get_streaming_renderer(self):
+        """Accepted renderer if it is compact JSON, else None (no streaming)"""
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if not isinstance(renderer, JSONRenderer) or not renderer.compact:
+            return None
+        if renderer.get_indent(self.request.accepted_media_type, {}):
+            return None
+        return renderer
+
+    def _stream_document(self, document, renderer):
+        """
+        Same bytes as renderer.render(document), produced by pieces: meta
+        first, then the rows by chunks.
+        """
+        render = renderer.render
+        data = document['data']
+        yield b'{' + b','.join(
+            render(key) + b':' + render(value)
+            for key, value in document.items() if key != 'data'
+        ) + b',"data":['
+        for start in range(0, len(data), self.stream_chunk_size):
+            chunk = data[start:start + self.stream_chunk_size]
+            yield (b',' if start else b'') + b','.join(render(row) for row in chunk)
+        yield b']}'
+
     def _make_response_document(self, data, extra_meta={}):  # noqa: B006
         """Create object to return"""
         meta = OrderedDict(
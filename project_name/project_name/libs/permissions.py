@@ -1,14 +1,28 @@
 """Definition of classes that implement permissions"""
-from rest_framework import permissions
+from rest_framework import filters, permissions
+
+# Default name of the ForeignKey to the owner user. Views can override it
+# with an `owner_field` attribute.
+DEFAULT_OWNER_FIELD = 'user'
+
+
+def get_owner_field(view):
+    """Name of the owner ForeignKey of the objects served by view"""
+    return getattr(view, 'owner_field', DEFAULT_OWNER_FIELD)
 
 
 class RelatedUserOnly(permissions.BasePermission):
     """
-    Full rights granted only to related user
+    Full rights granted only to related user.
+    Compares the ForeignKey column (user_id), so the related user is not
+    loaded. Use RelatedUserFilterBackend to apply it to lists.
     """
 
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.user
+        user_id = getattr(request.user, 'pk', None)
+        if user_id is None:
+            return False
+        return getattr(obj, '{}_id'.format(get_owner_field(view))) == user_id
 
 
 class SameUserPermission(permissions.BasePermission):
@@ -16,4 +30,33 @@ class SameUserPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
+        # Model equality: same concrete model and pk, no query either.
         return obj == request.user
+
+
+class RelatedUserFilterBackend(filters.BaseFilterBackend):
+    """
+    Queryset counterpart of RelatedUserOnly: only rows of the related user
+    are fetched (WHERE user_id = %s), for lists and for get_object.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        user_id = getattr(request.user, 'pk', None)
+        if user_id is None:
+            return queryset.none()
+        return queryset.filter(**{'{}_id'.format(get_owner_field(view)): user_id})
+
+
+class SameUserFilterBackend(filters.BaseFilterBackend):
+    """
+    Queryset counterpart of SameUserPermission, for querysets of users: safe
+    methods see every user, the others only the user doing the request.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if request.method in permissions.SAFE_METHODS:
+            return queryset
+        user_id = getattr(request.user, 'pk', None)
+        if user_id is None:
+            return queryset.none()
+        return queryset.filter(pk=user_id)
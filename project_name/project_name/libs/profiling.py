@@ -0,0 +1,187 @@
+"""
+Opt-in per request profiling.
+
+ProfilingMiddleware profiles a sample of the requests with a statistical
+(sampling) profiler: a background thread records the stack of the request
+thread every PROFILING_INTERVAL_MS. For each profiled request two files are
+written to PROFILING_DIR:
+    <name>.collapsed  Collapsed stacks ("frame;frame;frame count"), ready for
+                      flamegraph.pl or speedscope.
+    <name>.json       Request data, wall time and every SQL query with its
+                      duration.
+
+Which requests are profiled:
+    - A random fraction of them, PROFILING_SAMPLE_RATE (0.0 to 1.0).
+    - Those carrying a valid signed token in the X-Profile header, see
+      make_profiling_token(). Useful to profile one slow production call:
+          $ http GET https://host/api/... X-Profile:<token>
+
+When a request is not sampled the middleware only draws a random number and
+looks for a header. Add it to MIDDLEWARE next to GlobalRequestMiddleware:
+    '{{project_name}}.libs.profiling.ProfilingMiddleware',
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.utils import timezone
+
+log = logging.getLogger(__name__)
+
+PROFILING_HEADER = 'HTTP_X_PROFILE'
+TOKEN_SALT = 'libs.profiling'
+DEFAULT_INTERVAL_MS = 5
+DEFAULT_TOKEN_MAX_AGE = 60 * 60
+
+_UNSAFE_CHARS_RE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+def make_profiling_token():
+    """Signed value for the X-Profile header, valid PROFILING_TOKEN_MAX_AGE."""
+    return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def _has_valid_token(request):
+    token = request.META.get(PROFILING_HEADER)
+    if not token:
+        return False
+    max_age = getattr(settings, 'PROFILING_TOKEN_MAX_AGE', DEFAULT_TOKEN_MAX_AGE)
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=max_age) == 'profile'
+    except signing.BadSignature:
+        return False
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return '{}:{}'.format(code.co_filename, code.co_name)
+
+
+class StackSampler(threading.Thread):
+    """
+        Thread sampling the stack of another thread every `interval` seconds
+        and counting identical stacks.
+    """
+
+    def __init__(self, thread_id, interval):
+        super(StackSampler, self).__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            frames = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        return '\n'.join('{} {}'.format(stack, count) for stack, count in self.stacks.items())
+
+
+class SQLRecorder(object):
+    """Execute wrapper keeping every query and its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+class ProfilingMiddleware(object):
+    """
+    Middleware profiling a sample of the requests, see module docstring.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.interval = getattr(settings, 'PROFILING_INTERVAL_MS', DEFAULT_INTERVAL_MS) / 1000.0
+        self.output_dir = getattr(settings, 'PROFILING_DIR', None)
+
+    def should_profile(self, request):
+        if self.output_dir is None:
+            return False
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        return _has_valid_token(request)
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        recorder = SQLRecorder()
+        wrappers = [connections[alias].execute_wrapper(recorder) for alias in connections]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+
+        started_at = timezone.now()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+            wall_ms = (time.perf_counter() - start) * 1000
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+
+        self.write_profile(request, response, sampler, recorder, started_at, wall_ms)
+        return response
+
+    def write_profile(self, request, response, sampler, recorder, started_at, wall_ms):
+        name = '{}-{}-{}'.format(
+            started_at.strftime('%Y%m%d-%H%M%S-%f'),
+            request.method,
+            _UNSAFE_CHARS_RE.sub('_', request.path).strip('_')[:80],
+        )
+        summary = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status_code': response.status_code,
+            'started_at': started_at.isoformat(),
+            'wall_ms': round(wall_ms, 3),
+            'samples': sum(sampler.stacks.values()),
+            'interval_ms': self.interval * 1000,
+            'sql_count': len(recorder.queries),
+            'sql_ms': round(sum(query['duration_ms'] for query in recorder.queries), 3),
+            'sql': recorder.queries,
+        }
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base_path = os.path.join(self.output_dir, name)
+            with open(base_path + '.collapsed', 'w') as collapsed:
+                collapsed.write(sampler.collapsed())
+            with open(base_path + '.json', 'w') as summary_file:
+                json.dump(summary, summary_file, indent=2)
+        except (IOError, OSError) as err:
+            # Profiling must never break the request it profiles.
+            log.error('[profiling] Could not write profile %s: %s', name, err)
@@ -0,0 +1,140 @@
+"""
+Per request query budget.
+
+QueryBudgetMiddleware counts the queries (and their total time) run on every
+database connection while a request is served. Views declare their budget
+with class attributes, available on every viewset of libs/views.py:
+
+    class InvoiceViewSet(APIViewSet):
+        max_queries = 10                       # or {'list': 5, 'retrieve': 3}
+        max_query_time_ms = 200
+
+or with the libs.decorators.query_budget class decorator.
+
+When a budget is exceeded the middleware acts following the
+QUERY_BUDGET_ACTION setting:
+    'log':   log a warning (default).
+    'warn':  issue a QueryBudgetWarning (python warnings).
+    'raise': raise QueryBudgetExceeded (meant for dev/test).
+
+Add it to MIDDLEWARE, after the authentication middleware:
+    '{{project_name}}.libs.query_budget.QueryBudgetMiddleware',
+"""
+import logging
+import time
+import warnings
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+log = logging.getLogger(__name__)
+
+ACTION_LOG = 'log'
+ACTION_WARN = 'warn'
+ACTION_RAISE = 'raise'
+
+
+class QueryBudgetExceeded(Exception):
+    """A view ran more queries (or query time) than it declared."""
+
+
+class QueryBudgetWarning(UserWarning):
+    """Warning issued when QUERY_BUDGET_ACTION = 'warn'."""
+
+
+class QueryCounter(object):
+    """
+        Execute wrapper (see connection.execute_wrapper) counting queries and
+        their duration.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration_ms += (time.perf_counter() - start) * 1000
+
+    def track(self):
+        """Context manager installing this counter on every connection."""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+
+def get_view_budget(view_func, method):
+    """
+        Return (max_queries, max_query_time_ms) declared by the view behind
+        view_func, resolving per action budgets of viewsets.
+    """
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return None, None
+
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    budget = []
+    for attr in ('max_queries', 'max_query_time_ms'):
+        value = getattr(view_class, attr, None)
+        if isinstance(value, dict):
+            value = value.get(action)
+        budget.append(value)
+    return tuple(budget)
+
+
+def check_budget(counter, max_queries, max_query_time_ms, label=''):
+    """Return a description of the exceeded budget, or None."""
+    problems = []
+    if max_queries is not None and counter.count > max_queries:
+        problems.append('{} queries (budget {})'.format(counter.count, max_queries))
+    if max_query_time_ms is not None and counter.duration_ms > max_query_time_ms:
+        problems.append('{:.1f}ms of queries (budget {}ms)'.format(
+            counter.duration_ms, max_query_time_ms))
+    if not problems:
+        return None
+    return '[query budget] {} exceeded: {}'.format(label, ', '.join(problems))
+
+
+class QueryBudgetMiddleware(object):
+    """
+    Middleware counting the queries of each request and enforcing the budget
+    declared by its view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.action = getattr(settings, 'QUERY_BUDGET_ACTION', ACTION_LOG)
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        request.query_counter = counter
+        request.query_budget = (None, None)
+
+        with counter.track():
+            response = self.get_response(request)
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(counter.count)
+            response['X-Query-Time-Ms'] = '{:.1f}'.format(counter.duration_ms)
+
+        message = check_budget(counter, *request.query_budget, label=request.path)
+        if message:
+            self.on_exceeded(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_view_budget(view_func, request.method)
+
+    def on_exceeded(self, message):
+        if self.action == ACTION_RAISE:
+            raise QueryBudgetExceeded(message)
+        if self.action == ACTION_WARN:
+            warnings.warn(message, QueryBudgetWarning)
+        else:
+            log.warning(message)
@@ -0,0 +1,139 @@
+"""
+Faster JSON rendering and parsing for the REST API.
+
+FastJSONRenderer and FastJSONParser use orjson when it is installed (see
+requirements/optionals.txt) and DRF's stdlib based JSONRenderer/JSONParser
+otherwise, or whenever orjson can not handle the payload.
+
+The output matches JSONRenderer's: compact separators, UTF-8 (not ASCII
+escaped), U+2028/U+2029 escaped, UUIDs as strings and datetimes, Decimals,
+timedeltas, querysets, ... through DRF's JSONEncoder. Known differences:
+    - Floats written with an exponent: orjson gives 1e16, the stdlib 1e+16
+      (both valid JSON, same value).
+    - NaN and Infinity floats: orjson writes null, DRF raises ValueError.
+Requests asking for indented output (Accept: application/json; indent=4)
+are rendered by the stdlib. Bodies with 20 digits or more in a row are
+parsed by the stdlib: orjson reads integers of 2**64 and more as (lossy)
+floats.
+
+MessagePackRenderer and MessagePackParser (application/msgpack, needs the
+msgpack package) are a compact binary format for internal clients. They are
+opt-in: add them to the renderer/parser classes of a view, or to the
+REST_FRAMEWORK defaults with API_MSGPACK (see settings/production.py).
+"""
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils import encoders, json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    ORJSON_ERRORS = (TypeError, orjson.JSONEncodeError)
+
+_encoder = encoders.JSONEncoder()
+# Integers orjson would not parse exactly (2**64 has 20 digits). Also matches
+# digits in strings or long fractions, these are just parsed by the stdlib.
+LONG_NUMBER_RE = re.compile(rb'\d{20}')
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer using orjson when available."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super(FastJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context)
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) or \
+                not self.compact or self.ensure_ascii:
+            return super(FastJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except ORJSON_ERRORS:
+            # Integers over 64 bits, unsupported types, ...: same behaviour
+            # (and same errors) as the stdlib renderer.
+            return super(FastJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context)
+
+        # Same as JSONRenderer: these are valid JSON but not valid JavaScript.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(parsers.JSONParser):
+    """JSONParser using orjson when available."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super(FastJSONParser, self).parse(stream, media_type, parser_context)
+
+        content = stream.read() if stream is not None else b''
+        if not LONG_NUMBER_RE.search(content):
+            try:
+                return orjson.loads(content)
+            except orjson.JSONDecodeError:
+                # Let the stdlib parser decide, it gives DRF's usual error
+                # message (and accepts NaN when STRICT_JSON is False).
+                pass
+
+        parse_constant = json.strict_constant if self.strict else None
+        try:
+            return json.loads(content.decode(encoding), parse_constant=parse_constant)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImproperlyConfigured('The msgpack package is required to use MessagePack renderers.')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    MessagePack renderer. Types MessagePack does not know (datetimes,
+    Decimals, UUIDs, ...) are converted as in JSON, by DRF's JSONEncoder.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def __init__(self):
+        _require_msgpack()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True)
+
+
+class MessagePackParser(parsers.BaseParser):
+    """Parses MessagePack request bodies."""
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def __init__(self):
+        _require_msgpack()
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
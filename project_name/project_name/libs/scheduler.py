@@ -0,0 +1,255 @@
+"""
+In-process cron jobs.
+
+django_crontab starts a whole Django process for every job at every tick.
+`manage.py runcrons` starts once and runs the jobs registered with @cron
+in a pool of threads (or processes, --processes) when they are due:
+
+    from {{project_name}}.libs.scheduler import cron
+
+    @cron('*/5 * * * *', jitter=30)
+    def refresh_stats():
+        ...
+
+Jobs are registered by the cronjobs module of each installed app and by
+the modules in CRON_MODULES (imported by the runner).
+
+Schedules are the usual 5 fields (minute hour day month weekday, with *,
+lists, ranges and steps; sunday is 0 or 7) or @hourly, @daily, @weekly,
+@monthly, @yearly. A job with an invalid schedule, or a jobs module failing
+to import, is logged and left out: the other jobs still run.
+
+Overlaps: a job still running when it is due again is skipped, and each
+run holds a lock (lock='db': PostgreSQL advisory lock, shared by every
+host; lock='file': on CRON_LOCK_DIR, this host only) so a job never runs
+twice at the same time, even with several runners.
+
+jitter delays each run by a random 0 to jitter seconds, so jobs due at the
+same minute do not all hit the database at once.
+
+Start, end, duration and outcome of every run are logged in 'crons'.
+"""
+import fcntl
+import hashlib
+import importlib
+import logging
+import os
+import random
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+from django.utils.module_loading import module_has_submodule
+
+log = logging.getLogger('crons')
+
+LOCK_DB = 'db'
+LOCK_FILE = 'file'
+DEFAULT_LOCK_DIR = '/tmp/cron-locks'
+
+ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+    '@yearly': '0 0 1 1 *',
+}
+# (min, max) of minute, hour, day of month, month, day of week (0 and 7 =
+# sunday).
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+JOBS = OrderedDict()
+
+Job = namedtuple('Job', 'name func schedule jitter lock')
+
+
+def _parse_field(field, low, high):
+    values = set()
+    for part in field.split(','):
+        part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError('"{}" out of range {}-{}'.format(field, low, high))
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule(object):
+    """A cron expression, see module docstring."""
+
+    def __init__(self, expression):
+        self.expression = expression
+        fields = ALIASES.get(expression, expression).split()
+        if len(fields) != 5:
+            raise ValueError('Cron expression needs 5 fields: "{}"'.format(expression))
+        (self.minutes, self.hours, self.days,
+         self.months, self.weekdays) = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES))
+        self.weekdays = frozenset(weekday % 7 for weekday in self.weekdays)
+        # Like cron: when both are restricted, either day of month or day of
+        # week matching is enough.
+        self._any_day = fields[2] == '*' or fields[4] == '*'
+
+    def is_due(self, moment):
+        if moment.minute not in self.minutes or moment.hour not in self.hours or \
+                moment.month not in self.months:
+            return False
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        return (day and weekday) if self._any_day else (day or weekday)
+
+    def __str__(self):
+        return self.expression
+
+
+def cron(schedule, name=None, jitter=0, lock=None):
+    """Register the decorated function as a job, see module docstring."""
+    def register(func):
+        job_name = name or '{}.{}'.format(func.__module__, func.__name__)
+        try:
+            cron_schedule = CronSchedule(schedule)
+        except ValueError as err:
+            # Raised at import time: it would take the other jobs down.
+            log.error('[%s] not registered, invalid schedule: %s', job_name, err)
+            return func
+        JOBS[job_name] = Job(
+            job_name, func, cron_schedule, jitter,
+            lock or getattr(settings, 'CRON_LOCK', LOCK_DB),
+        )
+        return func
+    return register
+
+
+def discover_jobs():
+    """Import the modules registering jobs, return JOBS."""
+    modules = [
+        '{}.cronjobs'.format(app_config.name) for app_config in apps.get_app_configs()
+        if module_has_submodule(app_config.module, 'cronjobs')
+    ]
+    modules.extend(getattr(settings, 'CRON_MODULES', ()))
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('[%s] jobs module failed to import, its jobs are not run', module)
+    return JOBS
+
+
+def due_jobs(moment):
+    return [job for job in JOBS.values() if job.schedule.is_due(moment)]
+
+
+def _lock_key(name):
+    # Advisory locks take a bigint.
+    return int(hashlib.md5(('cron:' + name).encode()).hexdigest()[:15], 16)
+
+
+@contextmanager
+def _db_lock(name):
+    connection = connections[DEFAULT_DB_ALIAS]
+    key = _lock_key(name)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+
+
+@contextmanager
+def _file_lock(name):
+    lock_dir = getattr(settings, 'CRON_LOCK_DIR', DEFAULT_LOCK_DIR)
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, name + '.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            acquired = True
+        except BlockingIOError:
+            acquired = False
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def job_lock(job):
+    """Context manager telling (as value) if job's lock was acquired."""
+    if job.lock == LOCK_DB and connections[DEFAULT_DB_ALIAS].vendor == 'postgresql':
+        return _db_lock(job.name)
+    return _file_lock(job.name)
+
+
+def run_job(name, apply_jitter=True):
+    """
+    Run job `name` under its lock, log how it went. Returns 'success',
+    'failure' or 'locked'. Used by the runner threads (or processes).
+    """
+    job = JOBS[name]
+    if apply_jitter and job.jitter:
+        time.sleep(random.uniform(0, job.jitter))
+    try:
+        with job_lock(job) as acquired:
+            if not acquired:
+                log.warning('[%s] skipped, already running elsewhere', name)
+                return 'locked'
+            log.info('[%s] started', name)
+            started = time.perf_counter()
+            try:
+                job.func()
+            except Exception:  # pylint: disable=broad-except
+                log.exception('[%s] failed after %.3fs', name, time.perf_counter() - started)
+                return 'failure'
+            log.info('[%s] succeeded in %.3fs', name, time.perf_counter() - started)
+            return 'success'
+    finally:
+        # Connections of this thread: the runner lives long, do not keep them.
+        connections.close_all()
+
+
+class Runner(object):
+    """
+    Submits the due jobs to executor every minute, skipping the jobs whose
+    previous run is not finished.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.running = {}
+        self.stopped = False
+
+    def tick(self, moment=None):
+        moment = timezone.localtime(moment or timezone.now())
+        for name, future in list(self.running.items()):
+            if future.done():
+                del self.running[name]
+        for job in due_jobs(moment):
+            if job.name in self.running:
+                log.warning('[%s] skipped, previous run not finished', job.name)
+                continue
+            self.running[job.name] = self.executor.submit(run_job, job.name)
+
+    def run_forever(self):
+        while not self.stopped:
+            self.tick()
+            # Wake up at the beginning of the next minute, or when stopped.
+            next_minute = time.time() // 60 * 60 + 60
+            while not self.stopped and time.time() < next_minute:
+                time.sleep(min(1, next_minute - time.time()))
+
+    def stop(self):
+        self.stopped = True
@@ -0,0 +1,141 @@
+"""
+Sparse fieldsets for the viewsets of libs/views.py.
+
+    ?fields=id,name      only these fields are serialized
+    ?exclude=notes       every field but these
+    ?expand=user         the relation is serialized with the serializer
+                         declared in the serializer's Meta.expandable_fields
+
+    class ItemSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = Item
+            fields = ('id', 'name', 'notes', 'user')
+            expandable_fields = {'user': UserSerializer}
+
+The queryset follows: only the columns of the serialized fields are fetched
+(only()), and expanded relations are joined (select_related) or prefetched
+(prefetch_related for to-many relations). When a serialized field does not
+map to a model field (SerializerMethodField, properties, dotted sources) the
+columns it needs are unknown and every column is fetched.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+
+
+def parse_field_list(value):
+    """['a', 'b'] from 'a,b'"""
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def _model_field(model, source):
+    if model is None or source == '*' or '.' in source:
+        return None
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+
+
+class SparseFieldset(object):
+    """Fields selected by a request, see module docstring."""
+
+    def __init__(self, fields=(), exclude=(), expand=()):
+        self.fields = list(fields)
+        self.exclude = list(exclude)
+        self.expand = list(expand)
+
+    @classmethod
+    def from_query_params(cls, query_params, fields_param='fields',
+                          exclude_param='exclude', expand_param='expand'):
+        return cls(
+            parse_field_list(query_params.get(fields_param)),
+            parse_field_list(query_params.get(exclude_param)),
+            parse_field_list(query_params.get(expand_param)),
+        )
+
+    def __bool__(self):
+        return bool(self.fields or self.exclude or self.expand)
+
+    def is_selected(self, name):
+        if name in self.expand:
+            return True
+        if name in self.exclude:
+            return False
+        return not self.fields or name in self.fields
+
+    def apply_to_serializer(self, serializer):
+        """Expands and removes the fields of serializer (in place)."""
+        child = getattr(serializer, 'child', serializer)
+        fields = child.fields
+
+        unknown = [name for name in self.fields + self.exclude if name not in fields]
+        if unknown:
+            raise ValidationError({'fields': 'Unknown fields: {}'.format(', '.join(unknown))})
+
+        meta = getattr(child, 'Meta', None)
+        expandable = getattr(meta, 'expandable_fields', {})
+        not_expandable = [name for name in self.expand if name not in expandable]
+        if not_expandable:
+            raise ValidationError(
+                {'expand': 'Not expandable: {}'.format(', '.join(not_expandable))})
+
+        model = getattr(meta, 'model', None)
+        for name in self.expand:
+            serializer_class = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            source = fields[name].source if name in fields else name
+            model_field = _model_field(model, source)
+            many = bool(model_field and (model_field.many_to_many or model_field.one_to_many))
+            kwargs = {'many': many, 'read_only': True}
+            if source != name:
+                # DRF asserts the source is not redundant with the field name.
+                kwargs['source'] = source
+            fields[name] = serializer_class(**kwargs)
+
+        for name in list(fields):
+            if not self.is_selected(name):
+                fields.pop(name)
+        return serializer
+
+    def apply_to_queryset(self, queryset, fields, required_fields=()):
+        """
+        queryset restricted to the columns of fields (the serializer fields
+        left by apply_to_serializer), with expanded relations joined.
+        """
+        model = queryset.model
+        columns = set(required_fields)
+        known_columns = True
+        select_related, prefetch_related = [], []
+
+        for name, field in fields.items():
+            model_field = _model_field(model, field.source)
+            if model_field is None:
+                known_columns = False
+                continue
+            to_many = model_field.many_to_many or model_field.one_to_many
+            if model_field.concrete and not to_many:
+                columns.add(model_field.name)
+            if name in self.expand:
+                if to_many:
+                    prefetch_related.append(field.source)
+                else:
+                    select_related.append(field.source)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        if known_columns and (self.fields or self.exclude):
+            joined = queryset.query.select_related
+            if joined is True:
+                # Every relation is joined, they can not be deferred.
+                return queryset
+            # Relations joined by the view's queryset must not be deferred.
+            columns.update(joined or ())
+            queryset = queryset.only(*columns)
+        return queryset
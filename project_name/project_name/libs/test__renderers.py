@@ -0,0 +1,67 @@
+"""
+FastJSONRenderer/FastJSONParser must give the same results as DRF's
+JSONRenderer/JSONParser.
+
+    python -Wall manage.py test {{project_name}}.libs.test__renderers
+"""
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from .renderers import FastJSONParser, FastJSONRenderer
+
+
+def _parse(parser_class, content):
+    return parser_class().parse(io.BytesIO(content), 'application/json', {})
+
+
+class FastJSONRendererTest(SimpleTestCase):
+
+    def assert_same_output(self, data, accepted_media_type=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_same_output(self):
+        self.assert_same_output({
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'created_at': datetime.datetime(2018, 7, 1, 12, 30, 15, 123456,
+                                            tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2018, 7, 1),
+            'amount': Decimal('12.50'),
+            'name': 'Fran\u00e7ois \u2028 \u2029',
+            'tags': ['a', 'b'],
+            'nested': {'count': 3, 'ratio': 0.25, 'empty': None, 'ok': True},
+            'huge': 2 ** 70,
+        })
+
+    def test_indent_rendered_by_stdlib(self):
+        self.assert_same_output({'a': [1, 2]}, 'application/json; indent=4')
+
+    def test_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class FastJSONParserTest(SimpleTestCase):
+
+    def test_same_result(self):
+        content = '{"name": "François", "values": [1, 2.5, null, true], "n": -7}'.encode()
+        self.assertEqual(_parse(FastJSONParser, content), _parse(JSONParser, content))
+
+    def test_integer_over_64_bits(self):
+        content = b'{"n": 18446744073709551617, "m": [-36893488147419103232]}'
+        parsed = _parse(FastJSONParser, content)
+        self.assertEqual(parsed, {'n': 2 ** 64 + 1, 'm': [-2 ** 65]})
+        self.assertIsInstance(parsed['n'], int)
+        self.assertEqual(parsed, _parse(JSONParser, content))
+
+    def test_invalid(self):
+        with self.assertRaises(ParseError):
+            _parse(FastJSONParser, b'{"a": ')
@@ -0,0 +1,56 @@
+"""
+?fields, ?exclude and ?expand applied to a serializer.
+
+    python -Wall manage.py test {{project_name}}.libs.test__sparse_fields
+"""
+from django.contrib.auth.models import Group, User
+from django.test import SimpleTestCase
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .sparse_fields import SparseFieldset
+
+
+class GroupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Group
+        fields = ('id', 'name')
+
+
+class UserSerializer(serializers.ModelSerializer):
+    teams = serializers.PrimaryKeyRelatedField(source='groups', many=True, read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'email', 'groups', 'teams')
+        expandable_fields = {'groups': GroupSerializer, 'teams': GroupSerializer}
+
+
+class SparseFieldsetTest(SimpleTestCase):
+
+    def test_fields_and_exclude(self):
+        serializer = SparseFieldset(fields=['id', 'username', 'email'], exclude=['email']) \
+            .apply_to_serializer(UserSerializer())
+        self.assertEqual(list(serializer.fields), ['id', 'username'])
+
+    def test_expand(self):
+        serializer = SparseFieldset(expand=['groups']).apply_to_serializer(UserSerializer())
+        field = serializer.fields['groups']
+        self.assertIsInstance(field, serializers.ListSerializer)
+        self.assertIsInstance(field.child, GroupSerializer)
+        self.assertEqual(field.source, 'groups')
+
+    def test_expand_field_with_source(self):
+        serializer = SparseFieldset(expand=['teams']).apply_to_serializer(
+            UserSerializer(many=True))
+        field = serializer.child.fields['teams']
+        self.assertIsInstance(field.child, GroupSerializer)
+        self.assertEqual(field.source, 'groups')
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValidationError):
+            SparseFieldset(fields=['password_hint']).apply_to_serializer(UserSerializer())
+
+    def test_not_expandable(self):
+        with self.assertRaises(ValidationError):
+            SparseFieldset(expand=['email']).apply_to_serializer(UserSerializer())
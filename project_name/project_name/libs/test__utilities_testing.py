@@ -0,0 +1,45 @@
+"""
+Bulk generators of utilities_testing.
+
+    python -Wall manage.py test {{project_name}}.libs.test__utilities_testing
+"""
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+
+from .utilities_testing import TEST_PASSWORD, bulk_create_instances, bulk_create_test_users
+
+# More rows than fit in one INSERT on SQLite (999 variables per query).
+ROW_COUNT = 1500
+
+
+class BulkCreateInstancesTest(TestCase):
+
+    def test_inserts_every_row(self):
+        inserted = bulk_create_instances(
+            Group, ROW_COUNT, lambda number: Group(name='group {}'.format(number)),
+            chunk_size=600,
+        )
+        self.assertEqual(inserted, ROW_COUNT)
+        self.assertEqual(Group.objects.count(), ROW_COUNT)
+        self.assertTrue(Group.objects.filter(name='group {}'.format(ROW_COUNT - 1)).exists())
+
+
+class BulkCreateTestUsersTest(TestCase):
+
+    def test_users(self):
+        self.assertEqual(bulk_create_test_users(ROW_COUNT, start=10), ROW_COUNT)
+        self.assertEqual(User.objects.count(), ROW_COUNT)
+        user = User.objects.get(username='test_username10')
+        self.assertEqual(user.email, 'test_email10@example.com')
+        self.assertTrue(user.check_password(TEST_PASSWORD))
+
+    def test_profiles(self):
+        group = Group.objects.create(name='testers')
+        membership = User.groups.through
+
+        def build_profile(user, number):
+            self.assertIsNotNone(user.pk)
+            return membership(user=user, group=group)
+
+        bulk_create_test_users(ROW_COUNT, build_profile=build_profile)
+        self.assertEqual(group.user_set.count(), ROW_COUNT)
@@ -26,17 +26,25 @@ database user creation privileges:
 - http://dba.stackexchange.com/questions/33285/how-to-i-grant-a-user-account-permission-to-create-databases-in-postgresql  # noqa: E501
 """
 
+from contextlib import contextmanager
+from itertools import islice
+
 import factory
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 
 from auth_lifecycle.models import UserProfile
 
 from .models import MIN_BIRTH_YEAR
+from .query_budget import QueryCounter, check_budget
 
 TEST_USER_COUNT = 5
 """The number of test users to create. Equal to `5`."""
 TEST_PASSWORD = 'password123abc'
 """The password shared by all test users. Equal to `'password123abc'`."""
+BULK_CHUNK_SIZE = 1000
+"""Instances built (and kept in memory) at a time by the bulk generators.
+Equal to `1000`."""
 
 
 class UserProfileFactory(factory.django.DjangoModelFactory):
@@ -106,6 +114,98 @@ def create_insert_test_users():
     # print('b User.objects.count()=' + str(User.objects.count()))
 
 
+def _chunks(iterable, size):
+    """Yield lists of at most `size` items, consuming `iterable` lazily."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def bulk_create_instances(model, count, build, batch_size=None, user=None,
+                          chunk_size=BULK_CHUNK_SIZE):
+    """
+    Insert `count` rows of `model` with `bulk_create`, for load tests and
+    benchmarks. Instances are built `chunk_size` at a time, so millions of
+    rows can be seeded.
+
+    Parameters:
+    - build: callable receiving the row number (from zero) and returning an
+    unsaved instance.
+    - user: set as `created_by`/`updated_by` of `AuditedModel`-s, as
+    `bulk_create` skips `AuditedModel.save`.
+    - batch_size: rows per INSERT. Defaults to `None`, the backend's own
+    limit (SQLite caps the variables of a query).
+
+    *Warning*: `save()`, `full_clean()` and the signals are *not* run.
+
+    Returns the number of rows inserted.
+    """
+    audited = user is not None and hasattr(model, 'created_by')
+    inserted = 0
+    for chunk in _chunks((build(number) for number in range(count)), chunk_size):
+        if audited:
+            for instance in chunk:
+                instance.created_by = user
+                instance.updated_by = user
+        model.objects.bulk_create(chunk, batch_size=batch_size)
+        inserted += len(chunk)
+    return inserted
+
+
+def bulk_create_test_users(count, password=TEST_PASSWORD, batch_size=None,
+                           build_profile=None, start=0, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Insert `count` users, like `UserFactory.create_batch` but orders of
+    magnitude faster: the password is hashed once and shared by all of them,
+    and rows are inserted with `bulk_create`, `chunk_size` users built at a
+    time (`batch_size` as in `bulk_create_instances`).
+
+    Usernames, names and emails follow `UserFactory`, numbered from `start`.
+
+    Parameters:
+    - build_profile: optional callable receiving (user, number) and returning
+    an unsaved profile, inserted in bulk too (`UserFactory` does it through a
+    `RelatedFactory`).
+
+    Returns the number of users inserted.
+    """
+    password_hash = make_password(password)
+
+    def build_user(number):
+        return User(
+            username='test_username{}'.format(number),
+            first_name='test_first_name{}'.format(number),
+            last_name='test_last_name{}'.format(number),
+            email='test_email{}@example.com'.format(number),
+            password=password_hash,
+        )
+
+    inserted = 0
+    numbers = range(start, start + count)
+    for chunk in _chunks(((number, build_user(number)) for number in numbers), chunk_size):
+        users = User.objects.bulk_create([user for _, user in chunk], batch_size=batch_size)
+        inserted += len(users)
+        if build_profile is None:
+            continue
+
+        # Only some backends (PostgreSQL) return the primary keys.
+        if any(user.pk is None for user in users):
+            ids = {}
+            # IN lists of at most 500 usernames: SQLite limits the variables.
+            for usernames in _chunks((user.username for user in users), 500):
+                ids.update(User.objects.filter(
+                    username__in=usernames
+                ).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        profiles = [build_profile(user, number) for (number, _), user in zip(chunk, users)]
+        profiles[0].__class__.objects.bulk_create(profiles, batch_size=batch_size)
+    return inserted
+
+
 def login_get_next_user(test_instance):
     """
     Log in the next test user, assert it succeeded, and return the `User`
@@ -153,3 +253,44 @@ def debug_test_user(test_user, prefix=''):
     print('   email=' + test_user.email)
     print('   profile=' + str(profile))
     print('      profile.birth_year=' + str(profile.birth_year))
+
+
+@contextmanager
+def assert_query_budget(test_instance, max_queries=None, max_query_time_ms=None):
+    """
+    Fail the test if the code inside the block runs more than `max_queries`
+    queries, or spends more than `max_query_time_ms` in them, on any
+    database.
+
+        with assert_query_budget(self, max_queries=3):
+            self.client.get('/api/v1/invoices/')
+    """
+    counter = QueryCounter()
+    with counter.track():
+        yield counter
+    message = check_budget(counter, max_queries, max_query_time_ms, label='block')
+    if message:
+        test_instance.fail(message)
+
+
+def assert_view_query_budget(test_instance, view_class, url, method='get',
+                             action=None, **kwargs):
+    """
+    Request `url` with the test client and assert it stays within the budget
+    declared by `view_class` (max_queries / max_query_time_ms, for `action`
+    when they are declared by action). Returns the response.
+    """
+    budget = []
+    for attr in ('max_queries', 'max_query_time_ms'):
+        value = getattr(view_class, attr, None)
+        if isinstance(value, dict):
+            value = value.get(action)
+        budget.append(value)
+    test_instance.assertTrue(
+        any(value is not None for value in budget),
+        '{} declares no query budget'.format(view_class.__name__),
+    )
+
+    with assert_query_budget(test_instance, *budget):
+        response = getattr(test_instance.client, method)(url, **kwargs)
+    return response
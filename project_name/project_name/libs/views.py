@@ -1,11 +1,81 @@
 """File with combination of classes to inherit in our apps"""
-from rest_framework import mixins, viewsets
+from rest_framework import mixins, permissions, viewsets
 
+from . import db_routers
+from .global_request import get_current_user
 from .pagination import CustomPagination
+from .sparse_fields import SparseFieldset
 
 
 class APIPaginatedViewSet(viewsets.GenericViewSet):
     pagination_class = CustomPagination
+    # Query budget enforced by libs.query_budget.QueryBudgetMiddleware.
+    # An int, or a dict by action ({'list': 5, 'retrieve': 3}). None: no limit
+    max_queries = None
+    max_query_time_ms = None
+    # Actions whose reads may go to a replica (see libs.db_routers), '__all__'
+    # for every safe method request.
+    read_replica_actions = ('list', 'retrieve')
+    # Sparse fieldsets of safe method requests (see libs.sparse_fields):
+    # ?fields=a,b ?exclude=c ?expand=d. Set a parameter to None to disable it.
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    expand_query_param = 'expand'
+    # Columns fetched even when their field is not serialized (e.g. the
+    # owner field checked by permissions).
+    sparse_required_fields = ()
+
+    def reads_from_replica(self, request):
+        """Can the reads of this request go to a read replica?"""
+        if request.method not in permissions.SAFE_METHODS:
+            return False
+        if self.read_replica_actions != '__all__' and \
+                self.action not in self.read_replica_actions:
+            return False
+        # Read your writes: users who just wrote read from the primary.
+        return not db_routers.is_pinned_to_primary(get_current_user())
+
+    def get_sparse_fieldset(self):
+        """Fields selected by the request, None when it selects none."""
+        if not hasattr(self, '_sparse_fieldset'):
+            fieldset = None
+            request = getattr(self, 'request', None)
+            if request is not None and request.method in permissions.SAFE_METHODS:
+                fieldset = SparseFieldset.from_query_params(
+                    request.query_params, self.fields_query_param,
+                    self.exclude_query_param, self.expand_query_param,
+                ) or None
+            self._sparse_fieldset = fieldset
+        return self._sparse_fieldset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super(APIPaginatedViewSet, self).get_serializer(*args, **kwargs)
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is not None:
+            fieldset.apply_to_serializer(serializer)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super(APIPaginatedViewSet, self).filter_queryset(queryset)
+        fieldset = self.get_sparse_fieldset()
+        if fieldset is not None:
+            queryset = fieldset.apply_to_queryset(
+                queryset, self.get_serializer().fields, self.sparse_required_fields)
+        return queryset
+
+    def initial(self, request, *args, **kwargs):
+        super(APIPaginatedViewSet, self).initial(request, *args, **kwargs)
+        self._replica_reads = db_routers.replica_reads(self.reads_from_replica(request))
+        self._replica_reads.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica_reads = getattr(self, '_replica_reads', None)
+        if replica_reads is not None:
+            self._replica_reads = None
+            replica_reads.__exit__(None, None, None)
+        return super(APIPaginatedViewSet, self).finalize_response(
+            request, response, *args, **kwargs
+        )
 
 
 class APIViewSet(
@@ -30,7 +100,7 @@ class APIReadOnlyViewSet(
         APIPaginatedViewSet, mixins.RetrieveModelMixin, mixins.ListModelMixin
 ):
     """List and retrieve operations"""
-    pass
+    read_replica_actions = '__all__'
 
 
 class APIListRetrieveUpdateViewSet(
@@ -0,0 +1,198 @@
+"""
+Warm start of the WSGI application.
+
+The first requests of a fresh worker pay for what Django and DRF do lazily:
+importing the modules of the apps, building the URL resolver, the fields of
+the serializers, loading templates and translations, ... warm_up() does it
+up front. wsgi.py calls it when WARMUP_ON_LOAD is set, so with
+
+    gunicorn --preload {{project_name}}.wsgi
+
+it runs once in the master and the forked workers serve at full speed from
+their first request (without --preload, each worker runs it before serving).
+
+No database connection is left open: connections must not be shared with
+forked workers.
+
+Steps are in WARMUP_STEPS, WARMUP_SKIP lists the ones not to run. The
+`warmup` management command runs them and reports where the import time goes
+(python -X importtime of the warm up, see import_time_report()).
+"""
+import importlib
+import importlib.util
+import logging
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import connections
+from django.template import TemplateDoesNotExist, engines
+from django.urls import get_resolver
+from django.utils import translation
+
+from .checks import iter_view_classes
+
+log = logging.getLogger(__name__)
+
+# Modules of each app imported by the 'imports' step, when they exist.
+APP_MODULES = ('models', 'admin', 'signals', 'serializers', 'filters', 'views', 'urls')
+# Templates loaded by the 'templates' step (WARMUP_TEMPLATES adds to them).
+DEFAULT_TEMPLATES = ('rest_framework/api.html', 'admin/index.html')
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)')
+
+
+def import_app_modules():
+    imported = 0
+    for app_config in apps.get_app_configs():
+        for name in APP_MODULES:
+            module_name = '{}.{}'.format(app_config.name, name)
+            try:
+                if importlib.util.find_spec(module_name) is None:
+                    continue
+            except ImportError:
+                continue
+            importlib.import_module(module_name)
+            imported += 1
+    return '{} modules'.format(imported)
+
+
+def resolve_urlconf():
+    resolver = get_resolver()
+    # reverse_dict populates the resolver, the namespaces and app_names.
+    count = len(resolver.reverse_dict)
+    return '{} url names'.format(count)
+
+
+def build_serializers():
+    """Fields of the serializers of the views, built once (ModelSerializer
+    introspection of the models and their _meta caches)."""
+    built = set()
+    for view_class in iter_view_classes(get_resolver().url_patterns):
+        serializer_class = getattr(view_class, 'serializer_class', None)
+        if serializer_class is None or serializer_class in built:
+            continue
+        built.add(serializer_class)
+        try:
+            serializer_class().fields
+        except Exception as err:  # pylint: disable=broad-except
+            # Serializers needing a context (request, view) are skipped.
+            log.debug('[warmup] %s skipped: %s', serializer_class.__name__, err)
+    return '{} serializers'.format(len(built))
+
+
+def load_templates():
+    names = list(DEFAULT_TEMPLATES) + list(getattr(settings, 'WARMUP_TEMPLATES', ()))
+    loaded = 0
+    for engine in engines.all():
+        for name in names:
+            try:
+                engine.get_template(name)
+                loaded += 1
+            except TemplateDoesNotExist:
+                pass
+    return '{} templates'.format(loaded)
+
+
+def load_translations():
+    languages = {settings.LANGUAGE_CODE}
+    languages.update(code for code, _ in getattr(settings, 'WARMUP_LANGUAGES', ()))
+    for language in languages:
+        with translation.override(language):
+            translation.gettext('')
+    return '{} languages'.format(len(languages))
+
+
+def prime_caches():
+    # Instantiates the cache backends (and imports their client libraries),
+    # without connecting to the servers.
+    for alias in settings.CACHES:
+        caches[alias]
+    return '{} caches'.format(len(settings.CACHES))
+
+
+def run_checks():
+    # Imports the check modules and fills the libs.checks cache file.
+    messages = checks.run_checks()
+    return '{} messages'.format(len(messages))
+
+
+WARMUP_STEPS = OrderedDict((
+    ('imports', import_app_modules),
+    ('urls', resolve_urlconf),
+    ('serializers', build_serializers),
+    ('templates', load_templates),
+    ('translations', load_translations),
+    ('caches', prime_caches),
+    ('checks', run_checks),
+))
+
+
+def warm_up(skip=None):
+    """Runs the WARMUP_STEPS but skip (default WARMUP_SKIP), returns
+    [(step, seconds, summary)]."""
+    if skip is None:
+        skip = getattr(settings, 'WARMUP_SKIP', ())
+    modules_before = len(sys.modules)
+    started = time.perf_counter()
+    timings = []
+    for name, step in WARMUP_STEPS.items():
+        if name in skip:
+            continue
+        step_started = time.perf_counter()
+        try:
+            summary = step()
+        except Exception:  # pylint: disable=broad-except
+            # A failing step must not prevent the workers from starting.
+            log.exception('[warmup] step %s failed', name)
+            summary = 'failed'
+        timings.append((name, time.perf_counter() - step_started, summary))
+
+    # Steps may have connected (checks, user code): the workers must open
+    # their own connections.
+    connections.close_all()
+    log.info('[warmup] done in %.2fs, %d modules imported (pid %s): %s',
+             time.perf_counter() - started, len(sys.modules) - modules_before, os.getpid(),
+             ', '.join('{} {:.3f}s'.format(name, seconds) for name, seconds, _ in timings))
+    return timings
+
+
+def parse_importtime(output):
+    """
+    {module: (self_us, cumulative_us)} from the stderr of python -X importtime.
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, module = match.groups()
+            modules[module] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def import_time_report(settings_module=None, skip=()):
+    """
+    Imports Django, sets it up and warms up in a python -X importtime
+    subprocess. Returns its {module: (self_us, cumulative_us)}.
+    """
+    code = 'import django; django.setup(); from {} import warm_up; warm_up(skip={!r})'.format(
+        __name__, list(skip))
+    env = dict(os.environ)
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+    env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env,
+        universal_newlines=True, check=False,
+    )
+    if process.returncode:
+        raise RuntimeError('Warm up failed:\n' + process.stderr[-2000:])
+    return parse_importtime(process.stderr)
@@ -1,7 +1,24 @@
 # -*- coding: utf-8 -*-
-from rest_framework import permissions
+from rest_framework import filters, permissions
 from django.contrib.auth.models import User
 
+# Attribute of the request memoising IsDjangoUser's decision.
+IS_DJANGO_USER_ATTR = '_is_django_user'
+
+
+def is_django_user(request):
+    """
+    True if the user authenticated in the request is a django user. Decided
+    from request.user, already loaded by authentication, without queries, and
+    memoised on the request so object checks on list endpoints cost nothing.
+    """
+    decision = getattr(request, IS_DJANGO_USER_ATTR, None)
+    if decision is None:
+        user = getattr(request, 'user', None)
+        decision = isinstance(user, User) and user.is_authenticated and user.pk is not None
+        setattr(request, IS_DJANGO_USER_ATTR, decision)
+    return decision
+
 
 # class IsOwnerOrReadOnly(permissions.BasePermission):
 class IsDjangoUser(permissions.BasePermission):
@@ -20,9 +37,17 @@ class IsDjangoUser(permissions.BasePermission):
         # Write permissions are only allowed to the owner of the snippet.
         #return obj.owner == request.user
 
-        try:
-            user = User.objects.get(username=request.user.username)
-            return True
-        except User.DoesNotExist:
-            return False
+        return is_django_user(request)
+
+
+class IsDjangoUserFilterBackend(filters.BaseFilterBackend):
+    """
+    Bulk counterpart of IsDjangoUser for list endpoints: the whole queryset
+    is returned to django users, an empty one to anybody else, instead of
+    checking every object.
+    """
 
+    def filter_queryset(self, request, queryset, view):
+        if is_django_user(request):
+            return queryset
+        return queryset.none()
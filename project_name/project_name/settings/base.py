@@ -2,7 +2,6 @@
 
 import sys, os
 from datetime import timedelta
-import logging
 from os.path import abspath, basename, dirname, join, normpath
 from decouple import config
 
@@ -116,17 +115,83 @@ TEMPLATES = [
 ]
 ########## END TEMPLATE CONFIGURATION
 
+########## WARMUP CONFIGURATION
+# wsgi.py runs libs.warmup.warm_up() when the application is loaded (in the
+# master with gunicorn --preload). Steps not to run, extra templates to load.
+WARMUP_ON_LOAD = config('WARMUP_ON_LOAD', default=False, cast=bool)
+WARMUP_SKIP = ()
+WARMUP_TEMPLATES = ()
+########## END WARMUP CONFIGURATION
+
+########## CRON RUNNER CONFIGURATION
+# manage.py runcrons, see libs/scheduler.py. Modules registering @cron jobs
+# (besides the cronjobs module of every app), pool size, default lock ('db':
+# PostgreSQL advisory lock, 'file': lock files in CRON_LOCK_DIR).
+CRON_MODULES = ('{{project_name}}.cronjobs',)
+CRON_WORKERS = 4
+CRON_LOCK = 'db'
+CRON_LOCK_DIR = normpath(join(DJANGO_ROOT, 'logs/cron-locks'))
+########## END CRON RUNNER CONFIGURATION
+
+# Threads running the sync use cases awaited by internal_services.fan_out
+# (aexecute/ais_valid of use cases without native async I/O).
+USE_CASE_THREADS = 10
+
 ########## MIDDLEWARE CONFIGURATION
-MIDDLEWARE_CLASSES = (
+# Django >= 2.0 only reads MIDDLEWARE (MIDDLEWARE_CLASSES was removed).
+MIDDLEWARE = (
+    # Drops dead persistent DB connections, see DB_HEALTH_CHECK_INTERVAL.
+    '{{project_name}}.libs.db.ConnectionHealthCheckMiddleware',
+    # br/zstd/gzip compression, see COMPRESSION_* settings.
+    '{{project_name}}.libs.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.common.CommonMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # Counts queries per request, see QUERY_BUDGET_ACTION.
+    '{{project_name}}.libs.query_budget.QueryBudgetMiddleware',
+    # Opt-in sampling profiler, see PROFILING_* settings.
+    # '{{project_name}}.libs.profiling.ProfilingMiddleware',
+    # Makes the request available to models and @request_cached.
+    '{{project_name}}.libs.global_request.GlobalRequestMiddleware',
 #    'author.middlewares.AuthorDefaultBackendMiddleware',
 )
+
+########## DATABASE ROUTING
+# Reads of the libs/views.py viewsets go to DATABASE_REPLICAS (aliases of
+# DATABASES) when there are any, see libs/db_routers.py.
+DATABASE_ROUTERS = ['{{project_name}}.libs.db_routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+# Users read from the primary for this many seconds after writing.
+REPLICA_STICKY_SECONDS = 10
+# Replicas further behind than this are skipped (checked every interval).
+REPLICA_MAX_LAG_SECONDS = 5
+REPLICA_LAG_CHECK_INTERVAL = 5
+########## END DATABASE ROUTING
+
+# Seconds between health checks of a persistent (CONN_MAX_AGE) connection.
+DB_HEALTH_CHECK_INTERVAL = 30
+
+# What to do when a view exceeds its declared max_queries/max_query_time_ms:
+# 'log', 'warn' or 'raise'.
+QUERY_BUDGET_ACTION = 'log'
+
+# libs.profiling.ProfilingMiddleware: fraction of requests profiled (requests
+# with a signed X-Profile header are always profiled), sampling interval and
+# where collapsed stacks + SQL timings are written.
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_INTERVAL_MS = 5
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+PROFILING_DIR = normpath(join(DJANGO_ROOT, 'logs/profiles'))
+
+# libs.compression.CompressionMiddleware: responses smaller than this (bytes)
+# are not compressed. Encodings by order of preference (br needs brotli, zstd
+# needs zstandard, skipped when not installed) and their levels.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_ENCODINGS = ('br', 'zstd', 'gzip')
+COMPRESSION_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 5}
 ########## END MIDDLEWARE CONFIGURATION
 
 ########## URL CONFIGURATION
@@ -193,17 +258,36 @@ DJANGO_APPS = (
 THIRD_PARTY_APPS = (
     'rest_framework',
     'rest_framework_serializer_extensions',
-    'rest_framework_swagger',
     'django_crontab',
+)
+
+# Apps only used from the command line: the swagger UI is not routed and
+# django_extensions only brings management commands. django.setup() imports
+# every installed app, so they are left out of the web workers (not started
+# by manage.py) and of LEAN_COMMANDS, the commands run every minute by cron.
+TOOLING_APPS = (
+    'rest_framework_swagger',
     'django_extensions',
 )
+LEAN_COMMANDS = ('crontab', 'runcrons')
+_COMMAND = sys.argv[1] if len(sys.argv) > 1 and \
+    basename(sys.argv[0]) in ('manage.py', 'django-admin', 'django-admin.py') else None
+if _COMMAND is not None and _COMMAND not in LEAN_COMMANDS:
+    THIRD_PARTY_APPS += TOOLING_APPS
 
 # Apps specific for this project go here.
 LOCAL_APPS = (
+    # Management commands of libs (db_connections_report, ...)
+    '{{project_name}}.libs',
 )
 
 INSTALLED_APPS = DJANGO_APPS + LOCAL_APPS + THIRD_PARTY_APPS
 
+# On-disk cache of the custom model checks (libs/checks.py), with the other
+# runtime files rather than in the checkout. Set to None to always re-parse
+# the models modules.
+MODEL_CHECKS_CACHE_FILE = normpath(join(DJANGO_ROOT, 'logs/model_checks_cache.json'))
+
 
 ########## COMPRESSION CONFIGURATION
 # See: http://django_compressor.readthedocs.org/en/latest/settings/#django.conf.settings.COMPRESS_OFFLINE
@@ -250,10 +334,16 @@ REST_FRAMEWORK = {
 #    'DEFAULT_PERMISSION_CLASSES': [
 #            'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
 #        ],
+    # orjson based when installed, same output as DRF's JSONRenderer/JSONParser.
     'DEFAULT_RENDERER_CLASSES': (
-           'rest_framework.renderers.JSONRenderer',
+           '{{project_name}}.libs.renderers.FastJSONRenderer',
            'rest_framework.renderers.BrowsableAPIRenderer',
        ),
+    'DEFAULT_PARSER_CLASSES': (
+           '{{project_name}}.libs.renderers.FastJSONParser',
+           'rest_framework.parsers.FormParser',
+           'rest_framework.parsers.MultiPartParser',
+       ),
     #'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.IsAdminUser','rest_framework.permissions.IsAuthenticated','rest_framework.permissions.AllowAny',),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 30,
@@ -275,6 +365,12 @@ CORS_ALLOW_HEADERS = default_headers + (
 )
 ########## CORS CONFIG END
 
+########## LEGACY DB CONFIG
+# Statements sent through db_connections slower than this (milliseconds) are
+# logged in the 'legacy_db.slow' logger.
+LEGACY_DB_SLOW_QUERY_MS = config('LEGACY_DB_SLOW_QUERY_MS', default=500, cast=int)
+########## LEGACY DB CONFIG END
+
 ########## LOGGIN
 
 # If DEBUG=True, all logs (including django logs) will be
@@ -287,6 +383,11 @@ CORS_ALLOW_HEADERS = default_headers + (
 # logger = logging.getLogger(__name__)
 # logger.info("Log this message")
 
+# The handlers listed in LOGGING['queue'] are written by a background thread
+# (QueueListener), request threads only enqueue the records, see
+# libs/log_handlers.py. When the queue is full records are dropped.
+LOGGING_CONFIG = '{{project_name}}.libs.log_handlers.configure_logging'
+
 LOGGING = {
     'version': 1,
     # como se mergea con los loggers por defaul, le decimos q a esos no los disablee
@@ -305,6 +406,10 @@ LOGGING = {
             'format': '[%(asctime)s][%(levelname)s][%(name)s:%(lineno)d] %(message)s',
             'datefmt': "%Y-%m-%d %H:%M:%S",
         },
+        # One JSON object per line, see settings/production.py
+        'json_formatter': {
+            '()': '{{project_name}}.libs.log_handlers.JsonFormatter',
+        },
     },
     'handlers': {
         'mail_admins': {
@@ -382,7 +487,12 @@ LOGGING = {
             'handlers': ['console', 'production_file', 'debug_file'],
             'level': "DEBUG",
         },
-    }
+    },
+    'queue': {
+        'handlers': ['reqfile', 'production_file', 'debug_file', 'cron_file'],
+        'maxsize': 10000,
+        'policy': 'drop_new',
+    },
 }
 
 
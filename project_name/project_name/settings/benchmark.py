@@ -0,0 +1,33 @@
+# flake8: noqa
+
+from decouple import config
+
+from .base import *
+
+DEBUG = False
+
+# Host of the requests built by the suite (RequestFactory).
+ALLOWED_HOSTS = ['testserver']
+
+# SQLite in memory unless a local database is configured.
+DATABASES = {
+    'default': {
+        'ENGINE': config('BENCH_DB_ENGINE', default='django.db.backends.sqlite3'),
+        'NAME': config('BENCH_DB_NAME', default=':memory:'),
+        'USER': config('BENCH_DB_USER', default=''),
+        'PASSWORD': config('BENCH_DB_PASSWORD', default=''),
+        'HOST': config('BENCH_DB_HOST', default=''),
+        'PORT': '',
+    }
+}
+
+INSTALLED_APPS += (
+    '{{project_name}}.benchmarks',
+)
+
+# Fast password hashing
+PASSWORD_HASHERS = (
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+)
+
+MODEL_CHECKS_CACHE_FILE = None
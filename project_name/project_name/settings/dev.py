@@ -9,6 +9,11 @@ DEBUG = config('DEBUG', default=True, cast=bool)
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+QUERY_BUDGET_ACTION = 'warn'
+
+# Write the log files synchronously, easier to follow while debugging.
+LOGGING['queue']['handlers'] = []
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql_psycopg2',
@@ -17,6 +22,9 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': '',
+        # Keep connections open between requests (seconds, 0 closes them
+        # after each request). Use 0 with the postgresql_pool backend.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
     }
 }
 
@@ -69,7 +77,7 @@ if TESTING:
 
 
 ########## DJANGO-DEBUG-TOOLBAR CONFIGURATION
-#MIDDLEWARE_CLASSES += (
+#MIDDLEWARE += (
 #    'debug_toolbar.middleware.DebugToolbarMiddleware',
 #)
 #INSTALLED_APPS += (
@@ -5,7 +5,7 @@ from __future__ import absolute_import
 from os import environ
 
 from .base import *
-from decouple import config
+from decouple import config, Csv
 
 ALLOWED_HOSTS = []
 
@@ -19,6 +19,9 @@ EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_SUBJECT_PREFIX = '[%s] ' % SITE_NAME
 SERVER_EMAIL = EMAIL_HOST_USER
 
+# To pool connections in each worker instead of keeping one persistent
+# connection per thread, use ENGINE '{{project_name}}.db_backends.postgresql_pool'
+# with CONN_MAX_AGE 0 and OPTIONS {'pool_min_size': 1, 'pool_max_size': 10}.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql_psycopg2',
@@ -27,11 +30,84 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': '',
+        # Keep connections open between requests (seconds, 0 closes them
+        # after each request). Use 0 with the postgresql_pool backend.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
     }
 }
 
-CACHES = {}
+if config('DB_REPLICA_HOST', default=''):
+    DATABASES['replica'] = dict(
+        DATABASES['default'],
+        HOST=config('DB_REPLICA_HOST'),
+        USER=config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        PASSWORD=config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+    )
+    DATABASE_REPLICAS = ['replica']
+
+########## CACHE CONFIGURATION
+# 'default' is a small in-process LRU (L1, short lived) in front of 'shared'
+# (L2), see libs/cache_backends.py. L2 is Memcached or Redis when configured,
+# otherwise a file based cache shared by the workers of this host: its add()
+# is not atomic, so the single flight locks of libs.cache are per process.
+if config('MEMCACHED_LOCATION', default=''):
+    _SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': config('MEMCACHED_LOCATION', cast=Csv()),
+    }
+elif config('REDIS_URL', default=''):
+    _SHARED_CACHE = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': config('REDIS_URL'),
+    }
+else:
+    _SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('FILE_CACHE_LOCATION', default=join('/var/tmp', SITE_NAME + '-cache')),
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': '{{project_name}}.libs.cache_backends.TieredCache',
+        'OPTIONS': {
+            'L2_ALIAS': 'shared',
+            'L1_MAX_ENTRIES': config('CACHE_L1_MAX_ENTRIES', default=1000, cast=int),
+            'L1_TIMEOUT': config('CACHE_L1_TIMEOUT', default=5, cast=int),
+        },
+    },
+    'shared': _SHARED_CACHE,
+}
+########## END CACHE CONFIGURATION
 
 SECRET_KEY = get_env_setting('SECRET_KEY')
 
 CORS_ORIGIN_WHITELIST = ()
+
+# Warm up in the gunicorn master (--preload), see libs/warmup.py.
+WARMUP_ON_LOAD = config('WARMUP_ON_LOAD', default=True, cast=bool)
+
+########## REST FRAMEWORK CONFIGURATION
+# JSON only, with negotiation short-circuited for the usual Accept headers.
+# The browsable API is still served to staff users asking for HTML, see
+# libs/negotiation.py.
+REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+    '{{project_name}}.libs.renderers.FastJSONRenderer',
+)
+REST_FRAMEWORK['DEFAULT_CONTENT_NEGOTIATION_CLASS'] = \
+    '{{project_name}}.libs.negotiation.FastContentNegotiation'
+
+# MessagePack (Accept/Content-Type: application/msgpack) for internal clients.
+if config('API_MSGPACK', default=False, cast=bool):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] += (
+        '{{project_name}}.libs.renderers.MessagePackRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] += (
+        '{{project_name}}.libs.renderers.MessagePackParser',
+    )
+########## END REST FRAMEWORK CONFIGURATION
+
+########## LOGGING
+# Structured JSON lines in the log files.
+for _handler in ('reqfile', 'production_file', 'cron_file'):
+    LOGGING['handlers'][_handler]['formatter'] = 'json_formatter'
+########## END LOGGING
@@ -14,8 +14,17 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': '',
+        # Keep connections open between requests (seconds, 0 closes them
+        # after each request). Use 0 with the postgresql_pool backend.
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
     }
 }
+# Second connection to the same database acting as read replica, so the
+# replica routing (libs/db_routers.py) runs in tests.
+DATABASES['replica'] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+DATABASE_REPLICAS = ['replica']
+
+QUERY_BUDGET_ACTION = 'raise'
 
 # Fast password hashing
 PASSWORD_HASHERS = (
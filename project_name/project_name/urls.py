@@ -3,6 +3,8 @@ from django.contrib import admin
 
 from rest_framework import routers
 
+from .db_connections.views import LegacyQueryStatsView
+
 
 # django rest framework router
 router = routers.DefaultRouter()
@@ -12,4 +14,5 @@ urlpatterns = [
     url(r'^', include(router.urls)),
     url(r'^api-auth/', include('rest_framework.urls', namespace='rest_framework')),
     url(r'^admin/', admin.site.urls),
+    url(r'^internal/legacy-db-stats/$', LegacyQueryStatsView.as_view(), name='legacy-db-stats'),
 ]
@@ -32,6 +32,19 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project_name.settings.productio
 from django.core.wsgi import get_wsgi_application
 application = get_wsgi_application()
 
+# Import apps, build the URL resolver, serializers, ... now rather than on the
+# first requests. With gunicorn --preload this runs once, in the master,
+# before the workers are forked. See libs/warmup.py.
+from django.conf import settings  # noqa: E402
+if getattr(settings, 'WARMUP_ON_LOAD', False):
+    import logging
+    try:
+        from .libs.warmup import warm_up
+        warm_up()
+    except Exception:  # pylint: disable=broad-except
+        # Only a slower start: the application must still be served.
+        logging.getLogger(__name__).exception('[warmup] failed, serving without warm up')
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)